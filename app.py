@@ -1,15 +1,168 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+import asyncio
+import base64
+import functools
+import hashlib
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, conint
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+import numpy as np
 
-from main import Loan
+import profiling
+from cache import ResultCache
+from jobs import SUCCEEDED, JobQueue, MemoryJobStore, QueueFull, SQLiteJobStore
+from main import SCHEDULE_COLUMNS, Loan, amortize, first_changed_month, scenario_grid, set_stage_hook
 
-# Initialize the Loan object globally or per request if state management is complex
-# For this simple example, a global instance is fine, but be mindful in larger apps.
-loan = Loan()
-app = FastAPI()
+# Calculations are CPU-bound, so they run in a worker pool instead of on the event loop.
+# LOAN_EXECUTOR picks a 'thread' or 'process' pool; LOAN_EXECUTOR_WORKERS sets its size (default: CPU count).
+EXECUTOR_KIND = os.environ.get('LOAN_EXECUTOR', 'thread')
+EXECUTOR_WORKERS = int(os.environ['LOAN_EXECUTOR_WORKERS']) if os.environ.get('LOAN_EXECUTOR_WORKERS') else None
+if EXECUTOR_KIND not in ('thread', 'process'):
+    raise ValueError(f"LOAN_EXECUTOR must be 'thread' or 'process', got '{EXECUTOR_KIND}'.")
+
+_executor = None
+
+# LOAN_PROFILING=1 times each stage of a request (validation, calculate, schedule, serialize, encode
+# and total), adds a Server-Timing header to every response and exports histograms on /metrics.
+PROFILING = os.environ.get('LOAN_PROFILING', '0') == '1'
+stage_metrics = profiling.StageMetrics()
+
+# Repeated /calculate requests are answered from an LRU/TTL cache keyed by the normalized request.
+# LOAN_CACHE_SIZE bounds the number of entries (0 disables it), LOAN_CACHE_TTL is their lifetime in
+# seconds (0 keeps them until evicted), and LOAN_CACHE_JSON=1 caches the serialized response body
+# so hits also skip JSON encoding.
+CACHE_SIZE = int(os.environ.get('LOAN_CACHE_SIZE', 1024))
+CACHE_TTL = float(os.environ.get('LOAN_CACHE_TTL', 3600)) or None
+CACHE_JSON = os.environ.get('LOAN_CACHE_JSON', '0') == '1'
+result_cache = ResultCache(max_size=CACHE_SIZE, ttl=CACHE_TTL)
+
+# Full schedules of recent /calculate requests, keyed by calculation_id, so a follow-up request that only
+# edits extra payments (/calculate?base=<calculation_id>) reuses the unchanged months.
+# LOAN_SCHEDULE_STORE_SIZE bounds the number of schedules kept (0 disables it); they expire with LOAN_CACHE_TTL.
+SCHEDULE_STORE_SIZE = int(os.environ.get('LOAN_SCHEDULE_STORE_SIZE', 256))
+schedule_store = ResultCache(max_size=SCHEDULE_STORE_SIZE, ttl=CACHE_TTL)
+
+# Encodings for amortization_schedule, chosen with the format query parameter or the Accept header:
+# 'records' is a list of row objects; 'columns' maps each column name to a list of values; 'cents' is
+# 'columns' with money in integer cents; 'float64' packs every column as little-endian float64 values,
+# column after column, base64-encoded.
+SCHEDULE_FORMATS = ('records', 'columns', 'cents', 'float64')
+SCHEDULE_FORMAT_MEDIA_TYPES = {f"application/vnd.loan.{name}+json": name for name in SCHEDULE_FORMATS}
+
+# Schedule rows encoded per chunk of a /calculate/stream response
+STREAM_CHUNK_ROWS = 64
+
+# Batch and portfolio calculations can also be submitted as jobs (POST /jobs) and fetched when done.
+# Jobs run in their own pool so they never hold up interactive requests: LOAN_JOB_EXECUTOR picks a
+# 'process' (default) or 'thread' pool and LOAN_JOB_WORKERS the number of jobs run at once (default 1).
+# LOAN_JOB_QUEUE_SIZE bounds the jobs waiting to run (further submissions get a 429), LOAN_JOB_TTL is how
+# long finished jobs and their results are kept in seconds (0 keeps them), and LOAN_JOB_STORE names a
+# SQLite file that keeps jobs across restarts (default: jobs are kept in memory).
+JOB_EXECUTOR_KIND = os.environ.get('LOAN_JOB_EXECUTOR', 'process')
+JOB_WORKERS = int(os.environ.get('LOAN_JOB_WORKERS', 1))
+JOB_QUEUE_SIZE = int(os.environ.get('LOAN_JOB_QUEUE_SIZE', 100))
+JOB_TTL = float(os.environ.get('LOAN_JOB_TTL', 3600)) or None
+JOB_STORE = os.environ.get('LOAN_JOB_STORE', '')
+if JOB_EXECUTOR_KIND not in ('thread', 'process'):
+    raise ValueError(f"LOAN_JOB_EXECUTOR must be 'thread' or 'process', got '{JOB_EXECUTOR_KIND}'.")
+
+
+def get_executor():
+    """Returns the calculation worker pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        if EXECUTOR_KIND == 'process':
+            _executor = ProcessPoolExecutor(max_workers=EXECUTOR_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix='loan-calc')
+    return _executor
+
+
+def collect_stage_timings(func, *args, **kwargs):
+    """Runs func in a worker with engine profiling on. Returns its result and the stage timings recorded."""
+    set_stage_hook(profiling.record_stage)
+    token = profiling.start_timings()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        timings = profiling.stop_timings(token)
+    return result, timings
+
+
+async def run_in_executor(func, *args, **kwargs):
+    """
+    Runs func in the calculation worker pool without blocking the event loop.
+    With profiling on, the stages timed in the worker are added to the current request's timings.
+    """
+    loop = asyncio.get_running_loop()
+    if not PROFILING:
+        return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+    result, timings = await loop.run_in_executor(
+        get_executor(), functools.partial(collect_stage_timings, func, *args, **kwargs)
+    )
+    profiling.extend_timings(timings)
+    return result
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if JOB_EXECUTOR_KIND == 'process':
+        job_queue.executor = ProcessPoolExecutor(max_workers=JOB_WORKERS)
+    else:
+        job_queue.executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='loan-job')
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    job_queue.executor.shutdown(cancel_futures=True)
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+app = FastAPI(lifespan=lifespan)
+
+if PROFILING:
+    @app.middleware("http")
+    async def profile_request(request, call_next):
+        """Times the request's stages, reports them in Server-Timing and records them in the histograms."""
+        token = profiling.start_timings()
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            timings = profiling.stop_timings(token)
+        timings.append(('total', time.perf_counter() - started, None))
+        for stage_name, seconds, rows in timings:
+            stage_metrics.observe(stage_name, seconds, rows)
+        response.headers['Server-Timing'] = profiling.server_timing(timings)
+        return response
+
+# Longest loan term accepted, in years
+MAX_TERM_YEARS = 50
+
+# Upper bound on scenarios priced by a single /calculate/batch request, and a lower one when every
+# scenario's full schedule is returned
+MAX_BATCH_SCENARIOS = 10000
+MAX_SCHEDULE_BATCH_SCENARIOS = 250
+
+# Largest number of loans accepted by /portfolio
+MAX_PORTFOLIO_LOANS = 100000
+
+# Upper bound on scenarios or loans in a single job, and a lower one for batch jobs returning schedules:
+# the whole result is built in memory and stored as one JSON value, about 425 KB per 30-year schedule
+MAX_JOB_SCENARIOS = 100000
+MAX_SCHEDULE_JOB_SCENARIOS = 500
+
+# LoanScenarioGrid fields whose values are combined into scenarios
+GRID_AXES = ('price', 'down_percentage', 'term', 'rate', 'monthly_extra_payment', 'yearly_extra_payment')
 
 
 # Pydantic model for a single one-time payment
@@ -23,7 +176,7 @@ class OneTimePayment(BaseModel):
 class LoanCalculationRequest(BaseModel):
     price: float
     down_percentage: float
-    term: int
+    term: int = Field(ge=0, le=MAX_TERM_YEARS)
     rate: float
     start_month: int
     start_year: int
@@ -32,6 +185,323 @@ class LoanCalculationRequest(BaseModel):
     one_time_payments: Optional[List[OneTimePayment]] = []
 
 
+# Pydantic model for the /solve request payload: a loan and either a target payoff date or a target total interest
+class LoanSolveRequest(LoanCalculationRequest):
+    target_month: Optional[int] = None
+    target_year: Optional[int] = None
+    target_total_interest: Optional[float] = None
+    frequency: Optional[str] = 'monthly'
+
+
+# Pydantic model for a grid of scenarios: every combination of the listed values is priced
+class LoanScenarioGrid(BaseModel):
+    price: List[float]
+    down_percentage: List[float]
+    term: List[conint(ge=0, le=MAX_TERM_YEARS)]
+    rate: List[float]
+    start_month: int
+    start_year: int
+    monthly_extra_payment: Optional[List[float]] = [0.0]
+    yearly_extra_payment: Optional[List[float]] = [0.0]
+    one_time_payments: Optional[List[OneTimePayment]] = []
+
+
+# Pydantic model for the batch calculation request payload
+class LoanBatchRequest(BaseModel):
+    scenarios: Optional[List[LoanCalculationRequest]] = []
+    grid: Optional[LoanScenarioGrid] = None
+    include_schedule: Optional[bool] = False
+
+
+# Pydantic model for the /portfolio request payload
+class LoanPortfolioRequest(BaseModel):
+    loans: List[LoanCalculationRequest]
+    group_by: Optional[str] = None
+    rate_bucket: float = 0.5
+
+
+# Pydantic model for the POST /jobs payload: exactly one of a batch or a portfolio calculation
+class JobRequest(BaseModel):
+    batch: Optional[LoanBatchRequest] = None
+    portfolio: Optional[LoanPortfolioRequest] = None
+
+
+def describe_error(error):
+    """
+    Returns the HTTP status code and message reported for an exception raised by a calculation:
+    400 for invalid input (ValueError) or a division by zero, 500 for anything else.
+    """
+    if isinstance(error, ValueError):
+        return 400, f"Input Error: {error}"
+    if isinstance(error, ZeroDivisionError):
+        return 400, "Calculation Error: Division by zero. Check price or rates."
+    return 500, f"An unexpected server error occurred: {error}"
+
+
+def calculation_error(error):
+    """Returns the HTTPException for an exception raised by a calculation (see describe_error)."""
+    status_code, detail = describe_error(error)
+    return HTTPException(status_code=status_code, detail=detail)
+
+
+def format_payoff_date(payoff_month, payoff_year):
+    """Formats a payoff month/year for display, e.g. 'March 2054'."""
+    if payoff_month is None or payoff_year is None:
+        return "N/A"
+    try:
+        return datetime(payoff_year, payoff_month, 1).strftime('%B %Y')
+    except ValueError:
+        return "Invalid Date"
+
+
+def calculation_cache_key(params):
+    """
+    Normalizes LoanCalculationRequest fields into a hashable cache key.
+    Missing extras count as 0 and one-time payments are order-independent.
+    """
+    return (
+        float(params['price']), float(params['down_percentage']), int(params['term']), float(params['rate']),
+        int(params['start_month']), int(params['start_year']),
+        float(params.get('monthly_extra_payment') or 0), float(params.get('yearly_extra_payment') or 0),
+        tuple(sorted(
+            (int(op['year']), int(op['month']), float(op['amount']))
+            for op in params.get('one_time_payments') or []
+        ))
+    )
+
+
+def calculation_id(cache_key):
+    """Content-addressed handle of a calculation: a hash of its normalized request fields."""
+    return hashlib.sha256(repr(cache_key).encode()).hexdigest()[:32]
+
+
+def encode_json(content):
+    """Serializes a response body the way FastAPI's JSONResponse does."""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def resolve_schedule_format(schedule_format, accept):
+    """
+    Picks the schedule encoding from the format query parameter, falling back to a
+    vendor media type in the Accept header and then to 'records'.
+    """
+    if schedule_format is not None:
+        if schedule_format not in SCHEDULE_FORMATS:
+            raise ValueError(f"Unknown format '{schedule_format}'. Choose one of: {', '.join(SCHEDULE_FORMATS)}.")
+        return schedule_format
+    for media_type in (accept or "").split(","):
+        media_type = media_type.split(";")[0].strip()
+        if media_type in SCHEDULE_FORMAT_MEDIA_TYPES:
+            return SCHEDULE_FORMAT_MEDIA_TYPES[media_type]
+    return 'records'
+
+
+def encode_schedule(schedule, schedule_format='records'):
+    """Converts an amortization Schedule to its JSON-ready form in the given format."""
+    if schedule_format == 'records':
+        return schedule.to_records()
+    if schedule_format == 'columns':
+        return schedule.to_columns()
+    if schedule_format == 'cents':
+        encoded = {column: schedule[column].tolist() for column in SCHEDULE_COLUMNS[:2]}
+        for column in SCHEDULE_COLUMNS[2:]:
+            encoded[column] = np.rint(schedule[column] * 100).astype(np.int64).tolist()
+        return encoded
+    data = np.concatenate([schedule[column].astype('<f8') for column in SCHEDULE_COLUMNS])
+    return {
+        "columns": SCHEDULE_COLUMNS,
+        "rows": len(schedule),
+        "data": base64.b64encode(data.tobytes()).decode('ascii')
+    }
+
+
+def build_calculation_response(params, serialize=False, offset=0, limit=None, schedule_format='records', base=None):
+    """
+    Calculates one loan and builds its JSON-ready response, or its encoded body if serialize is set.
+    Only schedule rows offset to offset + limit are converted and returned, in schedule_format.
+    base is the (params, Schedule) of an earlier calculation of the same loan; the months before its first
+    changed payment are reused rather than recomputed.
+    Runs in the worker pool; params are the LoanCalculationRequest fields as a dict.
+    Returns the response and the full Schedule.
+    """
+    changed_month = first_changed_month(base[0], params) if base is not None else None
+    if changed_month is None:
+        result = amortize(**params)
+    else:
+        result = Loan().recalculate(base[1], changed_month, **params)
+    monthly_payment, total_amount_paid, schedule, payoff_month, payoff_year = result
+
+    # Convert the requested page of the schedule for JSON serialization
+    stop = offset + limit if limit is not None else None
+    page = schedule[offset:stop]
+    with profiling.stage('serialize', len(page)):
+        amortization_schedule = encode_schedule(page, schedule_format)
+
+    response = {
+        "monthly_payment": monthly_payment,
+        "total_amount_paid": total_amount_paid,
+        "amortization_schedule": amortization_schedule,
+        "schedule_format": schedule_format,
+        "schedule_length": len(schedule),
+        "payoff_date": format_payoff_date(payoff_month, payoff_year),
+        "calculation_id": calculation_id(calculation_cache_key(params))
+    }
+    if not serialize:
+        return response, schedule
+    with profiling.stage('encode'):
+        return encode_json(response), schedule
+
+
+def build_summary_response(params):
+    """
+    Calculates one loan's summary without building its schedule. params are the LoanCalculationRequest fields.
+    Runs in the worker pool.
+    """
+    with profiling.stage('calculate'):
+        summary = Loan().summarize(**params)
+    return {
+        "monthly_payment": summary.monthly_payment,
+        "total_amount_paid": summary.total_amount_paid,
+        "total_interest": summary.total_interest,
+        "months_saved": summary.months_saved,
+        "payoff_date": format_payoff_date(summary.payoff_month, summary.payoff_year)
+    }
+
+
+def stream_schedule(loan, rows, offset=0, limit=None):
+    """
+    Encodes a schedule as NDJSON while it is computed: a {"monthly_payment"} line, one line per schedule
+    row from offset to offset + limit, then a {"total_amount_paid", "schedule_length", "payoff_date"} line.
+    """
+    yield encode_json({"monthly_payment": loan.tp}) + b"\n"
+
+    stop = offset + limit if limit is not None else None
+    chunk = []
+    schedule_length = 0
+    for index, row in enumerate(rows):
+        schedule_length += 1
+        if index < offset or (stop is not None and index >= stop):
+            continue
+        chunk.append(encode_json(row))
+        if len(chunk) == STREAM_CHUNK_ROWS:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+    yield encode_json({
+        "total_amount_paid": loan.total,
+        "schedule_length": schedule_length,
+        "payoff_date": format_payoff_date(loan.payoff_month, loan.payoff_year)
+    }) + b"\n"
+
+
+def build_solve_response(params):
+    """Solves for the extra payment and builds the JSON-ready response. Runs in the worker pool."""
+    solution = Loan().solve_extra_payment(**params)
+    return {
+        "extra_payment": solution.extra_payment,
+        "frequency": solution.frequency,
+        "monthly_payment": solution.monthly_payment,
+        "total_amount_paid": solution.total_amount_paid,
+        "total_interest": solution.total_interest,
+        "payoff_date": format_payoff_date(solution.payoff_month, solution.payoff_year)
+    }
+
+
+def count_batch_scenarios(batch):
+    """
+    Returns the number of scenarios in a batch request (as a dict): its listed scenarios plus its grid's
+    combinations.
+    """
+    num_scenarios = len(batch['scenarios'])
+    if batch['grid'] is not None:
+        num_scenarios += math.prod(len(batch['grid'][name]) for name in GRID_AXES)
+    return num_scenarios
+
+
+def batch_scenarios(batch):
+    """Returns the scenarios of a batch request (as a dict), with its grid expanded."""
+    scenarios = list(batch['scenarios'])
+    if batch['grid'] is not None:
+        grid = dict(batch['grid'])
+        axes = {name: grid.pop(name) for name in GRID_AXES}
+        scenarios.extend(scenario_grid(axes, **grid))
+    return scenarios
+
+
+def build_batch_response(scenarios, include_schedule, schedule_format='records'):
+    """Prices a batch of scenarios and builds the JSON-ready response. Runs in the worker pool."""
+    response = []
+    for result in Loan.calculate_many(scenarios, include_schedule=include_schedule):
+        item = {
+            "monthly_payment": result['monthly_payment'],
+            "total_amount_paid": result['total_amount_paid'],
+            "total_interest": result['total_interest'],
+            "payoff_date": format_payoff_date(result['payoff_month'], result['payoff_year'])
+        }
+        if include_schedule:
+            item["amortization_schedule"] = encode_schedule(result['amortization_schedule'], schedule_format)
+            item["schedule_format"] = schedule_format
+        response.append(item)
+    return {"results": response}
+
+
+def build_portfolio_response(loans, group_by=None, rate_bucket=0.5):
+    """Projects a portfolio's monthly cash flows and builds the JSON-ready response. Runs in the worker pool."""
+    projection = Loan.project_portfolio(loans, group_by=group_by, rate_bucket=rate_bucket)
+    return {
+        "group_by": group_by,
+        "groups": [
+            {"group": group, "months": len(columns['Month']), "projection": {
+                name: values.tolist() for name, values in columns.items()
+            }}
+            for group, columns in sorted(projection.items(), key=lambda item: (item[0] is None, item[0]))
+        ]
+    }
+
+
+def run_batch_job(params):
+    """Runs a batch job: params is the LoanBatchRequest as a dict plus its schedule_format. Runs in the job pool."""
+    return build_batch_response(batch_scenarios(params), params['include_schedule'], params['schedule_format'])
+
+
+def run_portfolio_job(params):
+    """Runs a portfolio job: params is the LoanPortfolioRequest as a dict. Runs in the job pool."""
+    return build_portfolio_response(params['loans'], params['group_by'], params['rate_bucket'])
+
+
+job_queue = JobQueue(
+    {'batch': run_batch_job, 'portfolio': run_portfolio_job},
+    store=SQLiteJobStore(JOB_STORE) if JOB_STORE else MemoryJobStore(),
+    workers=JOB_WORKERS,
+    max_queued=JOB_QUEUE_SIZE,
+    result_ttl=JOB_TTL,
+    format_error=lambda error: describe_error(error)[1],
+)
+
+
+def format_timestamp(timestamp):
+    """Formats seconds since the epoch as an ISO 8601 UTC time, or None."""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def job_status_response(job):
+    """Builds the JSON-ready status of a job, without its result."""
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "created_at": format_timestamp(job.created_at),
+        "started_at": format_timestamp(job.started_at),
+        "finished_at": format_timestamp(job.finished_at),
+        "expires_at": format_timestamp(job.expires_at(job_queue.result_ttl)),
+        "error": job.error,
+    }
+
+
 @app.get("/")
 async def get_ui():
     """Serves the main HTML page."""
@@ -51,49 +521,262 @@ async def get_script():
 
 
 @app.post("/calculate")
-async def calculate_loan(request: LoanCalculationRequest):
+async def calculate_loan(
+    request: LoanCalculationRequest,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    schedule_format: Optional[str] = Query(None, alias="format"),
+    accept: Optional[str] = Header(None),
+    schedule: bool = Query(True),
+    base: Optional[str] = Query(None)
+):
     """
     Calculates loan payments and amortization schedule based on the provided data.
     Expects a JSON body matching the LoanCalculationRequest model.
+    offset and limit select a page of schedule rows; schedule_length is the full row count.
+    The schedule encoding is chosen with ?format= or an application/vnd.loan.<format>+json Accept header.
+    With schedule=false only the summary is returned, with total_interest and months_saved, and no
+    schedule is built.
+    base is the calculation_id of an earlier response for the same loan; when only extra payments changed,
+    the schedule months before the first changed payment are reused. Unknown or expired ids are ignored.
     """
+    profiling.record_since_start('validation')  # Request parsing and validation
     try:
-        # Call the calculate method from the Loan class
-        # Access parameters directly from the request object
-        monthly_payment, total_amount_paid, amortization_schedule_df, payoff_month, payoff_year = loan.calculate(
-            price=request.price,
-            down_percentage=request.down_percentage,
-            term=request.term,
-            rate=request.rate,
-            start_month=request.start_month,
-            start_year=request.start_year,
-            monthly_extra_payment=request.monthly_extra_payment,
-            yearly_extra_payment=request.yearly_extra_payment,
-            one_time_payments=[p.dict() for p in request.one_time_payments]  # Convert Pydantic models to dicts
+        if not schedule:
+            return await run_in_executor(build_summary_response, request.dict())
+
+        schedule_format = resolve_schedule_format(schedule_format, accept)
+        params = request.dict()
+        calculation_key = calculation_cache_key(params)
+        cache_key = (calculation_key, offset, limit, schedule_format)
+        response = result_cache.get(cache_key)
+
+        if response is None:
+            base_calculation = schedule_store.get(base) if base is not None else None
+            # With profiling on, encode in the worker so the JSON encoding stage is timed too
+            response, full_schedule = await run_in_executor(
+                build_calculation_response, params, CACHE_JSON or PROFILING, offset, limit, schedule_format,
+                base_calculation
+            )
+            result_cache.put(cache_key, response)
+            schedule_store.put(calculation_id(calculation_key), (params, full_schedule))
+        if isinstance(response, bytes):
+            return Response(content=response, media_type="application/json")
+        return response
+
+    except Exception as e:
+        raise calculation_error(e)
+
+
+@app.post("/calculate/stream")
+async def calculate_loan_stream(
+    request: LoanCalculationRequest,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """
+    Streams the amortization schedule as NDJSON, one row per line, as the rows are computed.
+    offset and limit select which schedule rows are sent.
+    """
+    try:
+        loan = Loan()
+        rows = loan.iter_schedule(**request.dict())
+    except Exception as e:
+        raise calculation_error(e)
+
+    return StreamingResponse(stream_schedule(loan, rows, offset, limit), media_type="application/x-ndjson")
+
+
+@app.post("/calculate/batch")
+async def calculate_loan_batch(
+    request: LoanBatchRequest,
+    schedule_format: Optional[str] = Query(None, alias="format"),
+    accept: Optional[str] = Header(None)
+):
+    """
+    Prices a list and/or grid of loan scenarios in one vectorized pass.
+    Returns summary fields per scenario; full amortization schedules only if include_schedule is set,
+    encoded as chosen with ?format= or the Accept header (see /calculate).
+    """
+    profiling.record_since_start('validation')  # Request parsing and validation
+    batch = request.dict()
+    num_scenarios = count_batch_scenarios(batch)
+    if num_scenarios > MAX_BATCH_SCENARIOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Input Error: at most {MAX_BATCH_SCENARIOS} scenarios per batch, got {num_scenarios}."
+        )
+    if request.include_schedule and num_scenarios > MAX_SCHEDULE_BATCH_SCENARIOS:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Input Error: at most {MAX_SCHEDULE_BATCH_SCENARIOS} scenarios per batch with include_schedule, "
+                f"got {num_scenarios}."
+            )
         )
 
-        # Format payoff date for display
-        payoff_date_str = "N/A"
-        if payoff_month is not None and payoff_year is not None:
-            try:
-                payoff_date_str = datetime(payoff_year, payoff_month, 1).strftime('%B %Y')
-            except ValueError:
-                payoff_date_str = "Invalid Date"
-
-        # Convert DataFrame to a list of dictionaries for JSON serialization
-        amortization_schedule_list = amortization_schedule_df.to_dict(orient='records')
-
-        # Return the calculated results
-        return {
-            "monthly_payment": monthly_payment,
-            "total_amount_paid": total_amount_paid,
-            "amortization_schedule": amortization_schedule_list,
-            "payoff_date": payoff_date_str
-        }
+    try:
+        scenarios = batch_scenarios(batch)
+        schedule_format = resolve_schedule_format(schedule_format, accept)
+        return await run_in_executor(build_batch_response, scenarios, request.include_schedule, schedule_format)
+
+    except Exception as e:
+        raise calculation_error(e)
+
+
+@app.post("/portfolio")
+async def project_portfolio(request: LoanPortfolioRequest):
+    """
+    Projects the combined principal, interest, payments, balance and active loan count per calendar month
+    across a book of loans, optionally grouped by term ('term') or rate bucket ('rate', rate_bucket
+    percentage points wide). Individual schedules are never built.
+    """
+    profiling.record_since_start('validation')  # Request parsing and validation
+    if len(request.loans) > MAX_PORTFOLIO_LOANS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Input Error: at most {MAX_PORTFOLIO_LOANS} loans per portfolio, got {len(request.loans)}."
+        )
+
+    try:
+        loans = [loan.dict() for loan in request.loans]
+        return await run_in_executor(build_portfolio_response, loans, request.group_by, request.rate_bucket)
 
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=f"Input Error: {ve}")
-    except ZeroDivisionError:
-        raise HTTPException(status_code=400, detail="Calculation Error: Division by zero. Check price or rates.")
     except Exception as e:
-        # Catch any other unexpected errors
-        raise HTTPException(status_code=500, detail=f"An unexpected server error occurred: {e}")
+        raise calculation_error(e)
+
+
+@app.post("/solve")
+async def solve_extra_payment(request: LoanSolveRequest):
+    """
+    Finds the smallest monthly or yearly extra payment that pays the loan off by target_month/target_year,
+    or keeps total interest at or below target_total_interest, without building a schedule.
+    The solved payment replaces the request's extra payment of the same frequency.
+    """
+    profiling.record_since_start('validation')  # Request parsing and validation
+    try:
+        return await run_in_executor(build_solve_response, request.dict())
+
+    except Exception as e:
+        raise calculation_error(e)
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(job_request: JobRequest, schedule_format: Optional[str] = Query(None, alias="format")):
+    """
+    Queues a batch or portfolio calculation (the payload of /calculate/batch or /portfolio, under 'batch'
+    or 'portfolio') to run in the background. Returns the job's status, including its job_id, for polling
+    GET /jobs/{job_id}. Answers 429 when the queue is full.
+    """
+    profiling.record_since_start('validation')  # Request parsing and validation
+    if (job_request.batch is None) == (job_request.portfolio is None):
+        raise HTTPException(status_code=400, detail="Input Error: give exactly one of 'batch' or 'portfolio'.")
+
+    if job_request.batch is not None:
+        kind, params = 'batch', job_request.batch.dict()
+        num_items = count_batch_scenarios(params)
+        try:
+            params['schedule_format'] = resolve_schedule_format(schedule_format, None)
+        except ValueError as ve:
+            raise calculation_error(ve)
+    else:
+        kind, params = 'portfolio', job_request.portfolio.dict()
+        num_items = len(params['loans'])
+    if num_items > MAX_JOB_SCENARIOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Input Error: at most {MAX_JOB_SCENARIOS} scenarios or loans per job, got {num_items}."
+        )
+    if kind == 'batch' and params['include_schedule'] and num_items > MAX_SCHEDULE_JOB_SCENARIOS:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Input Error: at most {MAX_SCHEDULE_JOB_SCENARIOS} scenarios per batch job with include_schedule, "
+                f"got {num_items}."
+            )
+        )
+
+    try:
+        job = await job_queue.submit(kind, params)
+    except QueueFull:
+        raise HTTPException(
+            status_code=429, detail="Job queue is full; retry later.", headers={"Retry-After": "10"}
+        )
+    return JSONResponse(
+        job_status_response(job), status_code=202, headers={"Location": f"/jobs/{job.id}"}
+    )
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Returns a job's status: queued, running, succeeded, failed (with its error) or cancelled."""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found. It may have expired.")
+    return job_status_response(job)
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Returns a succeeded job's result, the response /calculate/batch or /portfolio would have given."""
+    job = await job_queue.get(job_id, with_result=True)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found. It may have expired.")
+    if job.status != SUCCEEDED:
+        detail = f"Job is {job.status}."
+        if job.error:
+            detail += f" {job.error}"
+        raise HTTPException(status_code=409, detail=detail)
+    return job.result
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancels a queued or running job and returns its status. A running calculation finishes in the
+    background but its result is discarded. Finished jobs are left as they are.
+    """
+    job = await job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found. It may have expired.")
+    return job_status_response(job)
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Exposes result cache and job queue counters, and stage histograms when profiling is on, in Prometheus
+    text format.
+    """
+    stats = result_cache.stats()
+    lines = []
+    for name, kind, description in (
+        ('hits', 'counter', 'Requests answered from the result cache.'),
+        ('misses', 'counter', 'Requests that had to be calculated.'),
+        ('evictions', 'counter', 'Entries evicted to stay within the size limit.'),
+        ('expirations', 'counter', 'Entries dropped after their TTL elapsed.'),
+        ('size', 'gauge', 'Entries currently cached.'),
+        ('max_size', 'gauge', 'Maximum number of cached entries.'),
+    ):
+        metric = f"loan_cache_{name}_total" if kind == 'counter' else f"loan_cache_{name}"
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.append(f"{metric} {stats[name]}")
+    stats = await job_queue.stats()
+    for name, kind, description in (
+        ('submitted', 'counter', 'Jobs accepted by POST /jobs.'),
+        ('rejected', 'counter', 'Jobs refused because the queue was full.'),
+        ('succeeded', 'counter', 'Jobs that finished with a result.'),
+        ('failed', 'counter', 'Jobs that finished with an error.'),
+        ('cancelled', 'counter', 'Jobs cancelled before they finished.'),
+        ('queued', 'gauge', 'Jobs waiting to run.'),
+        ('running', 'gauge', 'Jobs running.'),
+        ('max_queued', 'gauge', 'Maximum number of jobs waiting to run.'),
+    ):
+        metric = f"loan_jobs_{name}_total" if kind == 'counter' else f"loan_jobs_{name}"
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.append(f"{metric} {stats[name]}")
+    if PROFILING:
+        lines.extend(stage_metrics.render())
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
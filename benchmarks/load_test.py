@@ -0,0 +1,120 @@
+"""
+Load test for POST /calculate.
+
+Starts uvicorn with an increasing number of worker processes and measures requests per second
+under a fixed number of concurrent clients, showing how throughput scales with cores.
+
+Usage (from the repository root):
+    python benchmarks/load_test.py --workers 1 2 4 --duration 10 --concurrency 32
+    LOAN_EXECUTOR=process python benchmarks/load_test.py --workers 1
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAYLOAD = json.dumps({
+    "price": 300000,
+    "down_percentage": 20,
+    "term": 30,
+    "rate": 5.0,
+    "start_month": 1,
+    "start_year": 2024,
+    "monthly_extra_payment": 200,
+    "yearly_extra_payment": 1000,
+    "one_time_payments": [{"amount": 5000, "month": 6, "year": 2025}]
+})
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/styles.css')
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not start within {timeout}s")
+
+
+def client(port, stop_at, counts, errors):
+    """Sends requests over one keep-alive connection until stop_at."""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    headers = {'Content-Type': 'application/json'}
+    done = failed = 0
+    while time.monotonic() < stop_at:
+        try:
+            conn.request('POST', '/calculate', body=PAYLOAD, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status == 200:
+                done += 1
+            else:
+                failed += 1
+        except (OSError, http.client.HTTPException):
+            failed += 1
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    counts.append(done)
+    errors.append(failed)
+
+
+def run(workers, duration, concurrency):
+    """Returns requests per second and error count for a server with the given number of workers."""
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app:app', '--port', str(port),
+         '--workers', str(workers), '--log-level', 'warning'],
+        cwd=REPO_ROOT
+    )
+    try:
+        wait_until_ready(port)
+        stop_at = time.monotonic() + duration
+        counts, errors = [], []
+        threads = [threading.Thread(target=client, args=(port, stop_at, counts, errors)) for _ in range(concurrency)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+        return sum(counts) / elapsed, sum(errors)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    default_workers = sorted({1, 2, 4, os.cpu_count() or 1})
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers,
+                        help="uvicorn worker counts to test (default: %(default)s)")
+    parser.add_argument('--duration', type=float, default=10, help="seconds per run (default: %(default)s)")
+    parser.add_argument('--concurrency', type=int, default=32, help="concurrent clients (default: %(default)s)")
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'req/s':>10} {'speedup':>8} {'errors':>7}")
+    baseline = None
+    for workers in args.workers:
+        throughput, errors = run(workers, args.duration, args.concurrency)
+        baseline = baseline or throughput
+        print(f"{workers:>8} {throughput:>10.1f} {throughput / baseline:>7.2f}x {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark of Loan.calculate as the number of one-time payments grows.
+
+Payments are spread over the 30-year term, several per month for the larger counts, as with
+biweekly-style plans or bonus schedules.
+
+Usage (from the repository root):
+    python benchmarks/one_time_payments.py --counts 0 10 100 1000 --repeat 20
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import ENGINES, Loan  # noqa: E402
+
+
+def make_payments(count, start_year=2024, years=30, seed=0):
+    rng = random.Random(seed)
+    return [
+        {'amount': rng.choice([100, 250, 500, 1000]), 'month': rng.randint(1, 12),
+         'year': rng.randint(start_year, start_year + years - 1)}
+        for _ in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--counts', type=int, nargs='+', default=[0, 10, 100, 1000],
+                        help="numbers of one-time payments (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=20, help="calls timed per case (default: %(default)s)")
+    args = parser.parse_args()
+
+    print(f"{'payments':>8} " + " ".join(f"{engine + ' ms':>10}" for engine in ENGINES))
+    for count in args.counts:
+        payments = make_payments(count)
+        timings = []
+        for engine in ENGINES:
+            seconds = min(timeit.repeat(
+                lambda: Loan().calculate(300000, 20, 30, 5.0, 1, 2024, 0, 0, payments, engine=engine),
+                number=1, repeat=args.repeat
+            ))
+            timings.append(seconds * 1000)
+        print(f"{count:>8} " + " ".join(f"{ms:>10.3f}" for ms in timings))
+
+
+if __name__ == "__main__":
+    main()
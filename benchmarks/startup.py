@@ -0,0 +1,69 @@
+"""
+Import-time and cold-start benchmark.
+
+Each measurement runs in a fresh interpreter, like a newly started worker:
+- import main: time to import the calculation engine
+- import app: time to import the FastAPI application
+- first /calculate: time from interpreter start to the first response body built by the app
+It also reports peak memory and whether pandas was imported.
+
+Usage (from the repository root):
+    python benchmarks/startup.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import json, resource, sys, time
+started = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "pandas_imported": "pandas" in sys.modules,
+}}))
+"""
+
+SCENARIOS = {
+    "import main": "import main",
+    "import app": "import app",
+    "first /calculate": (
+        "import app\n"
+        "app.build_calculation_response(dict(price=300000, down_percentage=20, term=30, rate=5.0,\n"
+        "    start_month=1, start_year=2024, monthly_extra_payment=200, yearly_extra_payment=1000,\n"
+        "    one_time_payments=[dict(amount=5000, month=6, year=2025)]))"
+    ),
+}
+
+
+def measure(body):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(body=body)],
+        cwd=REPO_ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help="fresh interpreters per scenario (default: %(default)s)")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<18} {'median ms':>10} {'min ms':>8} {'peak MB':>8} {'pandas':>7}")
+    for name, body in SCENARIOS.items():
+        results = [measure(body) for _ in range(args.runs)]
+        seconds = [result["seconds"] for result in results]
+        print(f"{name:<18} {statistics.median(seconds) * 1000:>10.1f} {min(seconds) * 1000:>8.1f} "
+              f"{max(result['max_rss_mb'] for result in results):>8.1f} "
+              f"{'yes' if any(result['pandas_imported'] for result in results) else 'no':>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Benchmark suite and regression guard for the Loan engine and the API.
+
+Engine cases cover terms from 1 to 50 years, 0 to 1000 one-time payments, zero-rate loans and
+early payoff, for every engine in main.ENGINES and the summary-only Loan.summarize, plus
+Loan.calculate_many. Each case records the per-call latency, schedule rows per second and peak
+traced memory. API cases send requests to the FastAPI app through an in-process client (result
+cache disabled) and record requests per second.
+
+Results are written as JSON and compared against a stored baseline; any metric worse than the
+baseline by more than the tolerance is reported and the run exits with status 1. Latency changes
+smaller than the noise floor (and the rows per second derived from them) are never counted, since
+a few microseconds of jitter on a 10 µs call would otherwise exceed any relative tolerance.
+
+Usage (from the repository root):
+    python benchmarks/suite.py                          # run and compare with benchmarks/baseline.json
+    python benchmarks/suite.py --output results.json    # also write the results
+    python benchmarks/suite.py --update-baseline        # store this run as the new baseline
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import timeit
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, 'benchmarks', 'baseline.json')
+
+sys.path.insert(0, REPO_ROOT)
+os.environ['LOAN_CACHE_SIZE'] = '0'  # Measure calculations, not cache hits
+
+from main import ENGINES, Loan, scenario_grid  # noqa: E402
+
+# Whether a larger value of each metric is better
+HIGHER_IS_BETTER = {
+    'latency_ms': False,
+    'rows_per_sec': True,
+    'peak_kib': False,
+    'requests_per_sec': True,
+}
+
+BASE_LOAN = dict(price=300000, down_percentage=20, term=30, rate=5.0, start_month=1, start_year=2024)
+
+
+def one_time_payments(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {'amount': rng.choice([100, 250, 500, 1000]), 'month': rng.randint(1, 12), 'year': rng.randint(2024, 2053)}
+        for _ in range(count)
+    ]
+
+
+def engine_cases():
+    """Returns (name, Loan.calculate keyword arguments) pairs."""
+    cases = [(f"term_{term}y", dict(BASE_LOAN, term=term)) for term in (1, 5, 15, 30, 50)]
+    cases += [(f"one_time_{count}", dict(BASE_LOAN, one_time_payments=one_time_payments(count)))
+              for count in (0, 10, 100, 1000)]
+    cases.append(("zero_rate_30y", dict(BASE_LOAN, rate=0.0)))
+    cases.append(("early_payoff_30y", dict(BASE_LOAN, monthly_extra_payment=2000, yearly_extra_payment=10000)))
+    return cases
+
+
+def measure_call(func, repeat):
+    """Returns the best per-call time in seconds over repeat timing runs, the return value and peak traced KiB."""
+    result = func()
+    timer = timeit.Timer(func)
+    number = timer.autorange()[0]  # Calls per run so each run takes at least 0.2 s
+    seconds = min(timer.repeat(number=number, repeat=repeat)) / number
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, result, peak / 1024
+
+
+def engine_benchmarks():
+    """Returns the engine cases as {name: (function to time, whether its result has a schedule)}."""
+    benchmarks = {}
+    for engine in ENGINES:
+        for name, kwargs in engine_cases():
+            benchmarks[f"engine.{engine}.{name}"] = (
+                lambda kwargs=kwargs, engine=engine: Loan().calculate(**kwargs, engine=engine), True
+            )
+
+    for name, kwargs in engine_cases():
+        benchmarks[f"engine.summarize.{name}"] = (lambda kwargs=kwargs: Loan().summarize(**kwargs), False)
+
+    scenarios = scenario_grid(
+        {'price': [200000 + 10000 * i for i in range(25)], 'rate': [3 + 0.25 * i for i in range(20)],
+         'term': [15, 30]},
+        down_percentage=20, start_month=1, start_year=2024
+    )
+    benchmarks["engine.calculate_many.1000_scenarios"] = (lambda: Loan.calculate_many(scenarios), False)
+    return benchmarks
+
+
+def run_engine_benchmarks(repeat, names=None):
+    """Measures the engine cases (only those in names, if given). Returns {name: metrics}."""
+    results = {}
+    for name, (func, has_schedule) in engine_benchmarks().items():
+        if names is not None and name not in names:
+            continue
+        seconds, result, peak_kib = measure_call(func, repeat)
+        results[name] = {'latency_ms': seconds * 1000}
+        if has_schedule:
+            results[name]['rows_per_sec'] = len(result.amortization_schedule) / seconds
+        results[name]['peak_kib'] = peak_kib
+    return results
+
+
+def run_api_benchmarks(duration):
+    from fastapi.testclient import TestClient
+    from app import app
+
+    batch = {'grid': {'price': [300000, 400000], 'down_percentage': [10, 20], 'term': [15, 30],
+                      'rate': [4.0, 4.5, 5.0, 5.5, 6.0], 'start_month': 1, 'start_year': 2024}}
+    requests = {
+        'api.calculate': ('/calculate', BASE_LOAN),
+        'api.calculate_cents': ('/calculate?format=cents', BASE_LOAN),
+        'api.calculate_page': ('/calculate?offset=0&limit=60', BASE_LOAN),
+        'api.calculate_summary': ('/calculate?schedule=false', BASE_LOAN),
+        'api.calculate_batch_40': ('/calculate/batch', batch),
+    }
+    results = {}
+    with TestClient(app) as client:
+        for name, (url, body) in requests.items():
+            client.post(url, json=body).raise_for_status()  # Warm up
+            count = 0
+            started = time.perf_counter()
+            while time.perf_counter() - started < duration:
+                client.post(url, json=body).raise_for_status()
+                count += 1
+            results[name] = {'requests_per_sec': count / (time.perf_counter() - started)}
+    return results
+
+
+def compare(results, baseline, tolerance, noise_floor_ms=0.05, names=None):
+    """
+    Prints each metric (of the cases in names, if given) against the baseline. Returns the names of
+    regressed metrics. A case whose latency moved by less than noise_floor_ms is not counted as a
+    latency or rows/sec regression.
+    """
+    regressions = []
+    print(f"{'benchmark':<44} {'metric':<17} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, metrics in results.items():
+        if names is not None and name not in names:
+            continue
+        for metric, value in metrics.items():
+            previous = baseline.get(name, {}).get(metric)
+            if previous is None:
+                print(f"{name:<44} {metric:<17} {'-':>12} {value:>12.2f} {'new':>8}")
+                continue
+            change = (value - previous) / previous if previous else 0.0
+            worse = -change if HIGHER_IS_BETTER[metric] else change
+            latency, previous_latency = metrics.get('latency_ms'), baseline[name].get('latency_ms')
+            within_noise = (
+                metric in ('latency_ms', 'rows_per_sec') and latency is not None and previous_latency is not None
+                and abs(latency - previous_latency) < noise_floor_ms
+            )
+            flag = ""
+            if worse > tolerance and not within_noise:
+                regressions.append(f"{name} {metric}")
+                flag = "  REGRESSION"
+            print(f"{name:<44} {metric:<17} {previous:>12.2f} {value:>12.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON file (default: %(default)s)")
+    parser.add_argument('--update-baseline', action='store_true', help="store the results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed relative slowdown before failing (default: %(default)s)")
+    parser.add_argument('--noise-floor-ms', type=float, default=0.05,
+                        help="latency changes smaller than this are never regressions (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=7,
+                        help="timing runs per engine case; the fastest is kept (default: %(default)s)")
+    parser.add_argument('--duration', type=float, default=2.0, help="seconds per API case (default: %(default)s)")
+    parser.add_argument('--skip-api', action='store_true', help="only run the engine benchmarks")
+    args = parser.parse_args()
+
+    results = run_engine_benchmarks(args.repeat)
+    if not args.skip_api:
+        results.update(run_api_benchmarks(args.duration))
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    else:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+
+    regressions = compare(results, baseline, args.tolerance, args.noise_floor_ms)
+    suspects = {regression.split()[0] for regression in regressions if regression.startswith('engine.')}
+    if suspects:
+        # Timings on a busy machine drift for seconds at a time, so measure flagged cases again and
+        # keep the better of the two runs before failing
+        print(f"\nRe-measuring {len(suspects)} flagged engine case(s)...\n")
+        for name, metrics in run_engine_benchmarks(args.repeat, suspects).items():
+            for metric, value in metrics.items():
+                better = max if HIGHER_IS_BETTER[metric] else min
+                results[name][metric] = better(results[name][metric], value)
+        regressions = [regression for regression in regressions if regression.split()[0] not in suspects]
+        regressions += compare(results, baseline, args.tolerance, args.noise_floor_ms, suspects)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    Bounded in-process cache with least-recently-used and time-to-live eviction.
+    Safe to share between threads. A max_size of 0 disables caching.
+    """
+
+    def __init__(self, max_size=1024, ttl=3600.0, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl  # Seconds an entry stays valid; None keeps entries until evicted by size
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0  # Entries dropped to stay within max_size
+        self.expirations = 0  # Entries dropped because they outlived the TTL
+
+        self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the cached value for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at is not None and self.clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Stores value under key, evicting the least recently used entries if the cache is full."""
+        if self.max_size <= 0:
+            return
+        expires_at = self.clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drops every entry. Counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Returns the cache counters and current size as a dict."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+            }
@@ -0,0 +1,437 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Job states. A job is queued until a worker claims it, then running until it finishes in one of
+# the FINISHED states.
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+# Seconds between sweeps for finished jobs whose results have expired
+PURGE_INTERVAL = 60.0
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when max_queued jobs are already waiting."""
+
+
+class Job:
+    """A submitted calculation: its kind, JSON-ready parameters, state and, once finished, result or error."""
+    __slots__ = (
+        'id', 'kind', 'params', 'status', 'created_at', 'started_at', 'finished_at', 'owner', 'heartbeat_at',
+        'result', 'error'
+    )
+
+    def __init__(self, id, kind, params, status=QUEUED, created_at=None, started_at=None, finished_at=None,
+                 owner=None, heartbeat_at=None, result=None, error=None):
+        self.id = id
+        self.kind = kind
+        self.params = params
+        self.status = status
+        self.created_at = created_at  # Timestamps are seconds since the epoch, so they survive a restart
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.owner = owner  # JobQueue.owner of the process running the job
+        self.heartbeat_at = heartbeat_at  # Last time the owner reported the job still running
+        self.result = result
+        self.error = error
+
+    def expires_at(self, ttl):
+        """Returns when the finished job and its result are dropped, or None if it never expires."""
+        if self.finished_at is None or ttl is None:
+            return None
+        return self.finished_at + ttl
+
+
+class MemoryJobStore:
+    """
+    Keeps jobs in a dict. Jobs are lost when the process exits and are only visible to this process.
+    Safe to share between threads.
+    """
+
+    def __init__(self):
+        self._jobs = {}
+        self._queued = {}  # Ids of the queued jobs, oldest first (a dict keeps insertion order)
+        self._lock = threading.Lock()
+
+    def add(self, job, max_queued):
+        """Stores a new queued job unless max_queued jobs are already queued. Returns whether it was added."""
+        with self._lock:
+            if len(self._queued) >= max_queued:
+                return False
+            self._jobs[job.id] = job
+            self._queued[job.id] = None
+            return True
+
+    def get(self, job_id, with_result=True):
+        """Returns the job with job_id, or None if there is none."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def count_queued(self):
+        with self._lock:
+            return len(self._queued)
+
+    def claim_next(self, owner, now):
+        """Marks the oldest queued job as running for owner and returns it, or returns None if none is queued."""
+        with self._lock:
+            if not self._queued:
+                return None
+            job = self._jobs[next(iter(self._queued))]
+            del self._queued[job.id]
+            job.status, job.started_at, job.owner, job.heartbeat_at = RUNNING, now, owner, now
+            return job
+
+    def heartbeat(self, owner, now):
+        """Records that owner is still running its jobs."""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == RUNNING and job.owner == owner:
+                    job.heartbeat_at = now
+
+    def finish(self, job_id, owner, status, now, result=None, error=None):
+        """
+        Records the outcome of a job owner is running. Returns False, recording nothing, if the job was
+        cancelled or handed to another owner meanwhile.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != RUNNING or job.owner != owner:
+                return False
+            job.status, job.finished_at, job.owner, job.result, job.error = status, now, None, result, error
+            return True
+
+    def cancel(self, job_id, now):
+        """
+        Cancels the job if it is queued or running. Returns the job (None if there is none) and whether it
+        was cancelled by this call.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return job, False
+            self._queued.pop(job_id, None)
+            job.status, job.finished_at, job.owner = CANCELLED, now, None
+            return job, True
+
+    def requeue_stale(self, heartbeat_before):
+        """Queues again the running jobs whose owner last reported before the given time. Returns how many."""
+        with self._lock:
+            stale = [
+                job for job in self._jobs.values()
+                if job.status == RUNNING and job.heartbeat_at < heartbeat_before
+            ]
+            for job in sorted(stale, key=lambda job: job.created_at):
+                job.status, job.started_at, job.owner, job.heartbeat_at = QUEUED, None, None, None
+                self._queued[job.id] = None
+        return len(stale)
+
+    def purge(self, finished_before):
+        """Deletes the jobs that finished before the given time. Returns how many were deleted."""
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished_at is not None and job.finished_at < finished_before
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+
+class SQLiteJobStore:
+    """
+    Keeps jobs in a SQLite database file, so queued jobs and finished results survive a restart and are
+    shared by every server process using the file. Parameters and results are stored as JSON. Safe to share
+    between threads.
+    """
+
+    COLUMNS = (
+        'id', 'kind', 'params', 'status', 'created_at', 'started_at', 'finished_at', 'owner', 'heartbeat_at',
+        'result', 'error'
+    )
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = None  # Opened on first use, so importing the app in a worker process stays cheap
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL,"
+                " status TEXT NOT NULL, created_at REAL NOT NULL, started_at REAL, finished_at REAL,"
+                " result TEXT, error TEXT, owner TEXT, heartbeat_at REAL)"
+            )
+            # Files written before jobs had owners
+            existing = {row[1] for row in connection.execute("PRAGMA table_info(jobs)")}
+            for name, kind in (('owner', 'TEXT'), ('heartbeat_at', 'REAL')):
+                if name not in existing:
+                    connection.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at)")
+            self._connection = connection
+        return self._connection
+
+    @contextmanager
+    def _transaction(self):
+        """Runs the block in a write transaction, so other processes cannot interleave with it."""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def _query(self, sql, parameters=()):
+        """
+        Returns every row of a query. Reading to the end finishes the statement; a statement left open keeps
+        its read snapshot, and once another process commits, this connection's next write fails at once
+        with "database is locked" instead of waiting.
+        """
+        with self._lock:
+            return self._connect().execute(sql, parameters).fetchall()
+
+    def _execute(self, sql, parameters=()):
+        """Runs a write statement and returns the number of rows it changed."""
+        with self._lock:
+            return self._connect().execute(sql, parameters).rowcount
+
+    def _select(self, where, with_result=True):
+        columns = self.COLUMNS if with_result else self.COLUMNS[:-2] + ('NULL', 'error')
+        return f"SELECT {', '.join(columns)} FROM jobs WHERE {where}"
+
+    def add(self, job, max_queued):
+        """Stores a new queued job unless max_queued jobs are already queued. Returns whether it was added."""
+        row = (job.id, job.kind, json.dumps(job.params), job.status, job.created_at)
+        with self._transaction() as connection:
+            queued = connection.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchall()[0][0]
+            if queued >= max_queued:
+                return False
+            connection.execute("INSERT INTO jobs (id, kind, params, status, created_at) VALUES (?, ?, ?, ?, ?)", row)
+            return True
+
+    def get(self, job_id, with_result=True):
+        """Returns the job with job_id, or None if there is none. with_result=False skips loading the result."""
+        rows = self._query(self._select("id = ?", with_result), (job_id,))
+        return self._job(rows[0]) if rows else None
+
+    def count_queued(self):
+        return self._query("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,))[0][0]
+
+    def claim_next(self, owner, now):
+        """Marks the oldest queued job as running for owner and returns it, or returns None if none is queued."""
+        oldest_queued = "status = ? ORDER BY created_at LIMIT 1"
+        if not self._query(f"SELECT id FROM jobs WHERE {oldest_queued}", (QUEUED,)):
+            return None  # Checked first so idle polling never takes the write lock
+        with self._transaction() as connection:
+            rows = connection.execute(self._select(oldest_queued), (QUEUED,)).fetchall()
+            if not rows:  # Claimed by another process meanwhile
+                return None
+            job = self._job(rows[0])
+            job.status, job.started_at, job.owner, job.heartbeat_at = RUNNING, now, owner, now
+            connection.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, owner = ?, heartbeat_at = ? WHERE id = ?",
+                (RUNNING, now, owner, now, job.id)
+            )
+            return job
+
+    def heartbeat(self, owner, now):
+        """Records that owner is still running its jobs."""
+        self._execute("UPDATE jobs SET heartbeat_at = ? WHERE status = ? AND owner = ?", (now, RUNNING, owner))
+
+    def finish(self, job_id, owner, status, now, result=None, error=None):
+        """
+        Records the outcome of a job owner is running. Returns False, recording nothing, if the job was
+        cancelled or handed to another owner meanwhile.
+        """
+        result = None if result is None else json.dumps(result)
+        return self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, owner = NULL, result = ?, error = ?"
+            " WHERE id = ? AND status = ? AND owner = ?",
+            (status, now, result, error, job_id, RUNNING, owner)
+        ) == 1
+
+    def cancel(self, job_id, now):
+        """
+        Cancels the job if it is queued or running. Returns the job (None if there is none) and whether it
+        was cancelled by this call.
+        """
+        cancelled = self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, owner = NULL WHERE id = ? AND status IN (?, ?)",
+            (CANCELLED, now, job_id, QUEUED, RUNNING)
+        ) == 1
+        return self.get(job_id, with_result=False), cancelled
+
+    def requeue_stale(self, heartbeat_before):
+        """Queues again the running jobs whose owner last reported before the given time. Returns how many."""
+        return self._execute(
+            "UPDATE jobs SET status = ?, started_at = NULL, owner = NULL, heartbeat_at = NULL"
+            " WHERE status = ? AND heartbeat_at < ?",
+            (QUEUED, RUNNING, heartbeat_before)
+        )
+
+    def purge(self, finished_before):
+        """Deletes the jobs that finished before the given time. Returns how many were deleted."""
+        return self._execute("DELETE FROM jobs WHERE finished_at < ?", (finished_before,))
+
+    @staticmethod
+    def _job(row):
+        id, kind, params, status, created_at, started_at, finished_at, owner, heartbeat_at, result, error = row
+        return Job(
+            id, kind, json.loads(params), status, created_at, started_at, finished_at, owner, heartbeat_at,
+            None if result is None else json.loads(result), error
+        )
+
+
+class JobQueue:
+    """
+    Bounded queue of calculation jobs, run by `workers` asyncio tasks that hand each job to `executor`.
+    handlers maps each job kind to a function of the job's parameters that returns a JSON-ready result;
+    with a process pool the functions must be picklable. Finished jobs are kept for result_ttl seconds
+    (None keeps them until the store is cleared).
+
+    The store holds every job's state, so several server processes can share a SQLiteJobStore: the queue
+    bound, status and cancellation apply across all of them, and each job is claimed by one process.
+    While it runs a job, the process reports a heartbeat every lease / 3 seconds; a job whose heartbeat
+    is older than lease seconds (its process stopped or crashed) is queued again.
+    """
+
+    def __init__(self, handlers, store=None, executor=None, workers=1, max_queued=100, result_ttl=3600.0,
+                 format_error=str, lease=30.0, poll_interval=1.0, clock=time.time):
+        self.handlers = handlers
+        self.store = store if store is not None else MemoryJobStore()
+        self.executor = executor
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.format_error = format_error  # Turns a handler's exception into the job's error message
+        self.lease = lease
+        self.poll_interval = poll_interval  # Seconds between checks for jobs submitted to other processes
+        self.clock = clock
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"  # Unique to this process and start
+
+        self.submitted = 0
+        self.rejected = 0  # Submissions refused because the queue was full
+        self.finished = {SUCCEEDED: 0, FAILED: 0, CANCELLED: 0}
+
+        self._running = {}  # job id -> Job being run by this process
+        self._wakeup = None  # Set when a job is submitted here, so an idle worker claims it at once
+        self._tasks = []
+
+    async def start(self):
+        """Starts the workers and the task that reports heartbeats and drops expired jobs."""
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._maintain()))
+
+    async def stop(self):
+        """
+        Stops the workers. Calculations already handed to the executor are abandoned; with a persistent
+        store their jobs are queued again once their lease runs out.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, kind, params):
+        """Stores and queues a new job. Raises QueueFull if max_queued jobs are already waiting."""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind '{kind}'.")
+        job = Job(uuid.uuid4().hex, kind, params, created_at=self.clock())
+        if not await asyncio.to_thread(self.store.add, job, self.max_queued):
+            self.rejected += 1
+            raise QueueFull(f"{self.max_queued} jobs are already queued.")
+        self.submitted += 1
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id, with_result=False):
+        """Returns the job with job_id, or None if there is none or it has expired."""
+        job = await asyncio.to_thread(self.store.get, job_id, with_result)
+        if job is None or self._expired(job):
+            return None
+        return job
+
+    async def cancel(self, job_id):
+        """
+        Cancels a queued or running job and returns it, or None if there is no such job. A running job's
+        calculation cannot be interrupted, so it finishes in the background and its result is discarded.
+        Finished jobs are returned unchanged.
+        """
+        job, cancelled = await asyncio.to_thread(self.store.cancel, job_id, self.clock())
+        if cancelled:
+            self.finished[CANCELLED] += 1
+        if job is None or self._expired(job):
+            return None
+        return job
+
+    async def stats(self):
+        """Returns this process's queue counters and the current sizes as a dict."""
+        return {
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+            'succeeded': self.finished[SUCCEEDED],
+            'failed': self.finished[FAILED],
+            'cancelled': self.finished[CANCELLED],
+            'queued': await asyncio.to_thread(self.store.count_queued),
+            'running': len(self._running),
+            'max_queued': self.max_queued,
+        }
+
+    def _expired(self, job):
+        expires_at = job.expires_at(self.result_ttl)
+        return expires_at is not None and self.clock() >= expires_at
+
+    async def _work(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self.store.claim_next, self.owner, self.clock())
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._running[job.id] = job
+            try:
+                try:
+                    result = await loop.run_in_executor(self.executor, self.handlers[job.kind], job.params)
+                    status, error = SUCCEEDED, None
+                except Exception as e:
+                    result, status, error = None, FAILED, self.format_error(e)
+            finally:
+                del self._running[job.id]
+            # Not recorded if the job was cancelled while it ran; its result is dropped
+            if await asyncio.to_thread(self.store.finish, job.id, self.owner, status, self.clock(), result, error):
+                self.finished[status] += 1
+
+    async def _maintain(self):
+        next_purge = self.clock()
+        while True:
+            now = self.clock()
+            if self._running:
+                await asyncio.to_thread(self.store.heartbeat, self.owner, now)
+            if await asyncio.to_thread(self.store.requeue_stale, now - self.lease):
+                self._wakeup.set()
+            if self.result_ttl is not None and now >= next_purge:
+                await asyncio.to_thread(self.store.purge, now - self.result_ttl)
+                next_purge = now + PURGE_INTERVAL
+            await asyncio.sleep(self.lease / 3)
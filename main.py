@@ -1,6 +1,555 @@
+import argparse
+import itertools
 import math
-import pandas as pd
-from datetime import datetime, timedelta  # Used for date formatting
+import time
+from collections import namedtuple
+import numpy as np
+from datetime import datetime  # Used for date formatting
+
+# Columns of the amortization schedule, in display order
+SCHEDULE_COLUMNS = [
+    'Month', 'Year', 'Principal Payment', 'Interest Payment',
+    'Principal Paid', 'Interest Paid', 'Loan Balance', 'Total Amount Paid'
+]
+
+# Available amortization engines for Loan.calculate
+ENGINES = ('numpy', 'loop')
+
+# How often the extra payment found by Loan.solve_extra_payment is made: every month, or every January
+EXTRA_PAYMENT_FREQUENCIES = ('monthly', 'yearly')
+
+# Balances below half a cent are treated as paid off, so floating-point residue
+# left after the final scheduled payment does not produce an extra payment row.
+_BALANCE_TOLERANCE = 0.005
+
+# Above this compound growth over the term, rounding in the month-by-month recurrence exceeds a
+# cent, so the NumPy engine defers to the loop engine to keep both engines in agreement.
+_NUMPY_MAX_GROWTH = 1e6
+
+# Loan.calculate arguments that must match for Loan.recalculate to reuse a schedule
+_LOAN_TERMS = ('price', 'down_percentage', 'term', 'rate', 'start_month', 'start_year')
+
+# Columns of a portfolio cash-flow projection (Loan.project_portfolio), one row per calendar month.
+# Active Loans counts the loans with a schedule row in the month, from their start to their payoff.
+PORTFOLIO_COLUMNS = [
+    'Month', 'Year', 'Principal Payment', 'Interest Payment', 'Total Payment', 'Loan Balance', 'Active Loans'
+]
+
+# Ways Loan.project_portfolio can group loans: all together, by term in years, or by rate bucket
+PORTFOLIO_GROUPINGS = (None, 'term', 'rate')
+
+# Scenarios priced together per 2-D array pass in Loan.calculate_many and Loan.project_portfolio, and the
+# most loan-months (scenarios times months of term) one pass may hold, bounding peak memory
+_BATCH_CHUNK_SIZE = 1024
+_BATCH_CHUNK_MONTHS = 1024 * 481  # 1,024 40-year loans
+
+# Optional profiling hook, called as hook(stage, seconds, rows) after each engine stage (see set_stage_hook)
+_stage_hook = None
+
+# Immutable result of a loan calculation; unpacks like the tuple Loan.calculate has always returned
+LoanResult = namedtuple(
+    'LoanResult',
+    ['monthly_payment', 'total_amount_paid', 'amortization_schedule', 'payoff_month', 'payoff_year']
+)
+
+# Result of Loan.summarize: LoanResult's summary fields without the schedule, plus the total interest
+# and the number of payments saved against the original term (None if the loan is never paid off)
+LoanSummary = namedtuple(
+    'LoanSummary',
+    ['monthly_payment', 'total_amount_paid', 'total_interest', 'payoff_month', 'payoff_year', 'months_saved']
+)
+
+# Result of Loan.solve_extra_payment
+ExtraPaymentSolution = namedtuple(
+    'ExtraPaymentSolution',
+    ['extra_payment', 'frequency', 'monthly_payment', 'total_amount_paid', 'total_interest',
+     'payoff_month', 'payoff_year']
+)
+
+
+class Schedule:
+    """
+    Amortization schedule stored column-wise as NumPy arrays keyed by SCHEDULE_COLUMNS.
+    Month and Year are integer columns, the rest are floats. Indexing with a column name returns
+    that column's array; indexing with a slice returns a Schedule of those rows.
+    pandas is only imported when to_dataframe is called.
+    """
+    __slots__ = ('columns',)
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    @classmethod
+    def from_records(cls, rows):
+        """Builds a schedule from row dicts keyed by SCHEDULE_COLUMNS."""
+        rows = list(rows)
+        return cls({
+            name: np.array([row[name] for row in rows], dtype=np.int64 if index < 2 else float)
+            for index, name in enumerate(SCHEDULE_COLUMNS)
+        })
+
+    def __len__(self):
+        return len(self.columns['Month'])
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.columns[key]
+        return Schedule({name: values[key] for name, values in self.columns.items()})
+
+    def to_records(self):
+        """Returns the rows as a list of dicts of Python numbers."""
+        values = [self.columns[name].tolist() for name in SCHEDULE_COLUMNS]
+        return [dict(zip(SCHEDULE_COLUMNS, row)) for row in zip(*values)]
+
+    def to_columns(self):
+        """Returns a dict mapping each column name to a list of Python numbers."""
+        return {name: self.columns[name].tolist() for name in SCHEDULE_COLUMNS}
+
+    def to_dataframe(self):
+        """Returns the schedule as a pandas DataFrame."""
+        import pandas as pd
+        return pd.DataFrame(self.columns, columns=SCHEDULE_COLUMNS)
+
+
+# Schedule of a Loan that has not been calculated yet, shared so creating a Loan stays cheap
+_EMPTY_SCHEDULE = Schedule.from_records([])
+
+
+def _apply_payment(balance, interest, base_payment, extra_payment):
+    """
+    Applies one month's payment to the balance.
+    Returns the principal actually paid and the cash paid out this month.
+    """
+    # Regular principal payment, capped at the current balance
+    regular_principal_payment = min(base_payment - interest, balance)
+    total_principal_reduction = regular_principal_payment + extra_payment
+    principal_payment = min(total_principal_reduction, balance)
+
+    cash_out = base_payment + extra_payment
+    if total_principal_reduction > balance:
+        # If total payments overpaid, the final payment is just remaining balance + interest
+        cash_out = interest + balance
+    return principal_payment, cash_out
+
+
+def set_stage_hook(hook):
+    """
+    Installs a callable that receives (stage, seconds, rows) after the 'calculate' and 'schedule'
+    stages of Loan.calculate, or removes it when hook is None.
+    """
+    global _stage_hook
+    _stage_hook = hook
+
+
+def _report_stage(stage, started, rows=None):
+    """Reports a stage that began at perf_counter value started. Returns the current perf_counter value."""
+    now = time.perf_counter()
+    if _stage_hook is not None:
+        _stage_hook(stage, now - started, rows)
+    return now
+
+
+def month_index(year, month):
+    """Integer index of a calendar month (year * 12 + month - 1), so consecutive months differ by 1."""
+    return year * 12 + month - 1
+
+
+def month_and_year(index):
+    """Calendar (month, year) of an integer month index."""
+    year, month = divmod(index, 12)
+    return month + 1, year
+
+
+def _check_terms(term, start_month, start_year):
+    """Raises ValueError for a negative term or a start month/year outside the calendar."""
+    if term < 0:
+        raise ValueError("Loan term cannot be negative.")
+    if not 1 <= start_month <= 12:
+        raise ValueError("Start month must be between 1 and 12.")
+    if not 1 <= start_year <= 9999:
+        raise ValueError("Start year must be between 1 and 9999.")
+
+
+def _index_one_time_payments(one_time_payments, start_index):
+    """
+    Sums one-time payments by month offset from the loan start (1 is the first payment month).
+    start_index is the loan start's month_index. Payments with an invalid month are ignored.
+    The input list is not modified.
+    """
+    payments_by_offset = {}
+    for op in one_time_payments:
+        if 1 <= op['month'] <= 12:
+            offset = month_index(op['year'], op['month']) - start_index
+            payments_by_offset[offset] = payments_by_offset.get(offset, 0) + op['amount']
+    return payments_by_offset
+
+
+def _extra_payments(start_index, horizon, monthly_extra_payment, yearly_extra_payment, one_time_payments):
+    """
+    Extra principal paid in each month of the horizon, one row per loan.
+    start_index holds each loan's start month_index; column i is month i + 1 after it.
+    """
+    periods = start_index[:, None] + np.arange(1, horizon + 1)
+    extras = np.repeat(np.asarray(monthly_extra_payment, dtype=float)[:, None], horizon, axis=1)
+    extras += np.where(periods % 12 == 0, np.asarray(yearly_extra_payment, dtype=float)[:, None], 0.0)  # January
+    for row, payments in enumerate(one_time_payments):
+        for offset, amount in _index_one_time_payments(payments, start_index[row]).items():
+            if 1 <= offset <= horizon:
+                extras[row, offset - 1] += amount
+    return extras
+
+
+def _growth_less_one(monthly_rate, months):
+    """
+    (1 + monthly_rate) ** months - 1, the compound growth of a balance less one. Computed through
+    log1p and expm1 because at tiny rates the power rounds to about 1 and subtracting 1 loses digits.
+    Works on floats and on NumPy arrays.
+    """
+    if isinstance(monthly_rate, np.ndarray) or isinstance(months, np.ndarray):
+        return np.expm1(months * np.log1p(monthly_rate))
+    return math.expm1(months * math.log1p(monthly_rate))
+
+
+def _needs_loop(monthly_rate, num_payments, extras):
+    """
+    Rows the vectorized engine cannot price. Negative extras can grow the balance, which the cap
+    detection does not model, and at very high rates the closed form drifts from the recurrence.
+    """
+    return (extras < 0).any(axis=1) | (num_payments * np.log1p(monthly_rate) > math.log(_NUMPY_MAX_GROWTH))
+
+
+def _loan_needs_loop(monthly_rate, num_payments, lowest_extra):
+    """_needs_loop for a single loan whose smallest extra payment is lowest_extra."""
+    return lowest_extra < 0 or num_payments * math.log1p(monthly_rate) > math.log(_NUMPY_MAX_GROWTH)
+
+
+def _uncapped_balances(principal, monthly_rate, num_payments, extras):
+    """
+    Loan balance after each month as if no payment were capped, one row per loan.
+    Without extra payments this is the closed-form remaining balance of the annuity; the future
+    value of the extras is subtracted from it as a discounted cumulative sum.
+    """
+    months = np.arange(1, extras.shape[1] + 1)
+    principal = principal[:, None]
+    monthly_rate = monthly_rate[:, None]
+    num_payments = num_payments[:, None]
+
+    growth_less_one = _growth_less_one(monthly_rate, months)
+    growth_full_term_less_one = _growth_less_one(monthly_rate, num_payments)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        balance = np.where(
+            monthly_rate == 0,
+            principal * (1 - months / num_payments),
+            principal * (growth_full_term_less_one - growth_less_one) / growth_full_term_less_one
+        )
+    if extras.any():
+        growth = growth_less_one + 1
+        balance = balance - growth * np.cumsum(extras / growth, axis=1)
+    return balance
+
+
+def _amortize_tail(balance, monthly_rate, base_payment, extras, principal_paid, interest_paid, total_paid):
+    """
+    Steps month by month through extras until the balance is paid off.
+    Returns one (principal payment, interest payment, principal paid, interest paid, loan balance,
+    total amount paid) tuple per month.
+    """
+    rows = []
+    for extra_payment in extras:
+        interest = balance * monthly_rate
+        principal_payment, cash_out = _apply_payment(balance, interest, base_payment, extra_payment)
+        balance -= principal_payment
+        if balance < _BALANCE_TOLERANCE:
+            balance = 0.0
+        principal_paid += principal_payment
+        interest_paid += interest
+        total_paid += cash_out
+        rows.append((principal_payment, interest, principal_paid, interest_paid, balance, total_paid))
+        if balance <= 0:
+            break
+    return rows
+
+
+def _continue_amortization(balance, monthly_rate, base_payment, extras, principal_paid, interest_paid, total_paid):
+    """
+    Months of extras after a known schedule state: the balance and running totals after some month.
+    Months before the first one whose payment reaches the balance are computed with NumPy, as in the
+    NumPy engine, and the rest with _amortize_tail. Returns the principal payment, interest payment,
+    principal paid, interest paid, loan balance and total amount paid columns for those months.
+    """
+    months = np.arange(1, len(extras) + 1)
+    if monthly_rate == 0:
+        balances = balance - base_payment * months - np.cumsum(extras)
+    else:
+        growth_less_one = _growth_less_one(monthly_rate, months)
+        growth = growth_less_one + 1
+        balances = (
+            balance * growth - base_payment * growth_less_one / monthly_rate - growth * np.cumsum(extras / growth)
+        )
+
+    capped = np.flatnonzero(balances < _BALANCE_TOLERANCE)
+    first_capped = capped[0] if len(capped) else len(extras)
+    balances = balances[:first_capped]
+    opening_balances = np.concatenate(([balance], balances[:-1])) if first_capped else balances
+    interest = opening_balances * monthly_rate
+    columns = [
+        opening_balances - balances,
+        interest,
+        principal_paid + (balance - balances),
+        interest_paid + np.cumsum(interest),
+        balances,
+        total_paid + np.cumsum(base_payment + extras[:first_capped]),
+    ]
+    if first_capped:
+        principal_paid, interest_paid, balance, total_paid = (float(column[-1]) for column in columns[2:])
+    tail = _amortize_tail(
+        balance, monthly_rate, base_payment, extras[first_capped:], principal_paid, interest_paid, total_paid
+    )
+    if not tail:
+        return columns
+    tail = np.array(tail, dtype=float)
+    return [np.concatenate((column, tail[:, index])) for index, column in enumerate(columns)]
+
+
+def _summarize_months(
+    principal, monthly_rate, base_payment, num_payments, start_index,
+    monthly_extra_payment, yearly_extra_payment, one_time_payments_by_offset
+):
+    """
+    Runs the loop engine's month-by-month recurrence without recording any rows.
+    Returns (months until payoff, total amount paid, interest paid); months is None if the
+    loan is not paid off within the loop engine's horizon.
+    """
+    balance = principal
+    interest_paid = 0.0
+    total_paid = 0.0
+    for i in range(1, num_payments + 2):
+        interest = balance * monthly_rate
+        extra_payment = monthly_extra_payment + one_time_payments_by_offset.get(i, 0)
+        if (start_index + i) % 12 == 0:  # January
+            extra_payment += yearly_extra_payment
+        principal_payment, cash_out = _apply_payment(balance, interest, base_payment, extra_payment)
+        balance -= principal_payment
+        interest_paid += interest
+        total_paid += cash_out
+        if balance < _BALANCE_TOLERANCE:
+            return i, total_paid, interest_paid
+    return None, total_paid, interest_paid
+
+
+def _level_balance(balance, monthly_rate, payment, months):
+    """Balance after months level payments of payment, ignoring the payoff cap (closed-form recurrence)."""
+    if monthly_rate == 0:
+        return balance - payment * months
+    growth_less_one = _growth_less_one(monthly_rate, months)
+    return balance * (growth_less_one + 1) - payment * growth_less_one / monthly_rate
+
+
+def _level_payoff_month(balance, monthly_rate, payment, months):
+    """
+    First of the next months (1-based) in which level payments of payment bring the balance below
+    _BALANCE_TOLERANCE, or None if that takes longer.
+    """
+    if months <= 0:
+        return None
+    if monthly_rate == 0:
+        if payment <= 0:
+            return None
+        payoff = math.floor((balance - _BALANCE_TOLERANCE) / payment) + 1
+    else:
+        if payment <= balance * monthly_rate:
+            return None  # The payment does not cover the interest
+        payoff = math.floor(
+            math.log((payment - _BALANCE_TOLERANCE * monthly_rate) / (payment - balance * monthly_rate))
+            / math.log1p(monthly_rate)
+        ) + 1
+    # Settle rounding at the boundary against the balance itself
+    payoff = max(payoff, 1)
+    while payoff > 1 and _level_balance(balance, monthly_rate, payment, payoff - 1) < _BALANCE_TOLERANCE:
+        payoff -= 1
+    while payoff <= months and _level_balance(balance, monthly_rate, payment, payoff) >= _BALANCE_TOLERANCE:
+        payoff += 1
+    return payoff if payoff <= months else None
+
+
+def _summarize_closed_form(
+    principal, monthly_rate, base_payment, num_payments, start_index,
+    monthly_extra_payment, yearly_extra_payment, one_time_payments_by_offset
+):
+    """
+    Same result as _summarize_months for non-negative extra payments, without stepping through every month.
+    Between months with a yearly or one-time payment the payment is level, so the balance follows the
+    closed-form annuity recurrence; only months with such a lump sum are stepped one at a time.
+    """
+    horizon = num_payments + 1  # Same extended period as the loop engine
+    payment = base_payment + monthly_extra_payment
+    lump_sums = {offset: amount for offset, amount in one_time_payments_by_offset.items() if 1 <= offset <= horizon}
+    if yearly_extra_payment:
+        first_january = 12 - start_index % 12  # First offset i with (start_index + i) % 12 == 0
+        for offset in range(first_january, horizon + 1, 12):
+            lump_sums[offset] = lump_sums.get(offset, 0) + yearly_extra_payment
+
+    balance = principal
+    month = 0
+    interest_paid = 0.0
+    total_paid = 0.0
+    for lump_sum_month in sorted(lump_sums) + [horizon + 1]:
+        # Level payments up to the month of the next lump sum
+        level_months = lump_sum_month - 1 - month
+        level_balance = _level_balance(balance, monthly_rate, payment, level_months)
+        payoff = None
+        if level_balance < _BALANCE_TOLERANCE:
+            payoff = _level_payoff_month(balance, monthly_rate, payment, level_months)
+        if payoff is not None:
+            # As in _apply_payment, the final month pays just the remaining balance and its interest
+            # only when an extra payment takes the principal paid beyond the balance
+            before_payoff = _level_balance(balance, monthly_rate, payment, payoff - 1)
+            final_interest = before_payoff * monthly_rate
+            final_payment = min(payment, before_payoff + final_interest) if monthly_extra_payment else payment
+            total_paid += payment * (payoff - 1) + final_payment
+            interest_paid += payment * (payoff - 1) - (balance - before_payoff) + final_interest
+            return month + payoff, total_paid, interest_paid
+        total_paid += payment * level_months
+        interest_paid += payment * level_months - (balance - level_balance)
+        balance = level_balance
+        if lump_sum_month > horizon:
+            break
+
+        month = lump_sum_month
+        interest = balance * monthly_rate
+        principal_payment, cash_out = _apply_payment(
+            balance, interest, base_payment, monthly_extra_payment + lump_sums[lump_sum_month]
+        )
+        balance -= principal_payment
+        interest_paid += interest
+        total_paid += cash_out
+        if balance < _BALANCE_TOLERANCE:
+            return month, total_paid, interest_paid
+    return None, total_paid, interest_paid
+
+
+def _annuity_payment(principal, monthly_rate, num_payments):
+    """Level monthly payment that pays off principal in num_payments months."""
+    if monthly_rate == 0:
+        return principal / num_payments
+    growth_less_one = _growth_less_one(monthly_rate, num_payments)
+    return principal * monthly_rate * (growth_less_one + 1) / growth_less_one
+
+
+def first_changed_month(previous, current):
+    """
+    First payment month (1 is the first payment after the start) whose payment differs between two sets
+    of Loan.calculate arguments, for Loan.recalculate. Returns None if the loan terms themselves differ,
+    so nothing can be reused, and the month after the loan's extended term if nothing differs.
+    """
+    if any(previous[name] != current[name] for name in _LOAN_TERMS):
+        return None
+    horizon = current['term'] * 12 + 1  # Same extended period as the engines
+    start_index = month_index(current['start_year'], current['start_month'])
+
+    changed = [horizon + 1]
+    if (previous.get('monthly_extra_payment') or 0) != (current.get('monthly_extra_payment') or 0):
+        changed.append(1)
+    if (previous.get('yearly_extra_payment') or 0) != (current.get('yearly_extra_payment') or 0):
+        changed.append(12 - start_index % 12)  # First January
+    previous_payments = _index_one_time_payments(previous.get('one_time_payments') or [], start_index)
+    current_payments = _index_one_time_payments(current.get('one_time_payments') or [], start_index)
+    changed.extend(
+        offset for offset in previous_payments.keys() | current_payments.keys()
+        if offset >= 1 and previous_payments.get(offset, 0) != current_payments.get(offset, 0)
+    )
+    return min(changed)
+
+
+def _chunk_balances(scenarios):
+    """
+    Loan terms, extra payments and uncapped balances (see _uncapped_balances) of a chunk of
+    Loan.calculate keyword argument dicts, one row per scenario. Returns principal, monthly_rate,
+    num_payments, start_index, base_payment, extras, degenerate (0 principal or 0 term loans, paid off
+    at start), use_loop (rows only the loop engine can price; their balances are left at 0) and balance.
+    """
+    for s in scenarios:
+        _check_terms(s['term'], s['start_month'], s['start_year'])
+    price = np.array([s['price'] for s in scenarios], dtype=float)
+    down = np.array([s['down_percentage'] for s in scenarios], dtype=float) / 100
+    num_payments = np.array([s['term'] for s in scenarios], dtype=np.int64) * 12
+    monthly_rate = np.array([s['rate'] for s in scenarios], dtype=float) / 100 / 12
+    start_index = np.array([month_index(s['start_year'], s['start_month']) for s in scenarios], dtype=np.int64)
+    principal = price * (1 - down)
+
+    # Base monthly payment (P&I) for the original term; 0 principal or 0 term loans are paid off at start
+    degenerate = (principal <= 0) | (num_payments == 0)
+    safe_num_payments = np.where(degenerate, 1, num_payments)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        growth_full_term_less_one = _growth_less_one(monthly_rate, safe_num_payments)
+        base_payment = np.where(
+            monthly_rate == 0,
+            principal / safe_num_payments,
+            principal * monthly_rate * (growth_full_term_less_one + 1) / growth_full_term_less_one
+        )
+    base_payment = np.where(degenerate, 0.0, base_payment)
+
+    horizon = int(num_payments.max()) + 1
+    extras = _extra_payments(
+        start_index, horizon,
+        [s.get('monthly_extra_payment') or 0 for s in scenarios],
+        [s.get('yearly_extra_payment') or 0 for s in scenarios],
+        [s.get('one_time_payments') or [] for s in scenarios],
+    )
+    use_loop = ~degenerate & _needs_loop(monthly_rate, num_payments, extras)
+    vectorized = ~degenerate & ~use_loop
+
+    balance = np.zeros_like(extras)
+    if vectorized.any():
+        balance[vectorized] = _uncapped_balances(
+            principal[vectorized], monthly_rate[vectorized], num_payments[vectorized], extras[vectorized]
+        )
+    return principal, monthly_rate, num_payments, start_index, base_payment, extras, degenerate, use_loop, balance
+
+
+def _term_chunks(scenarios):
+    """
+    Splits Loan.calculate keyword argument dicts into chunks of scenarios with the same term, so a long loan
+    never widens the 2-D arrays of shorter ones. Each chunk holds at most _BATCH_CHUNK_SIZE scenarios and
+    _BATCH_CHUNK_MONTHS loan-months, except that a single longer loan is a chunk of its own.
+    Yields (positions of the scenarios in the input, chunk) pairs.
+    """
+    pending = {}  # term -> (positions, chunk)
+    for position, scenario in enumerate(scenarios):
+        term = scenario['term']
+        positions, chunk = pending.setdefault(term, ([], []))
+        positions.append(position)
+        chunk.append(scenario)
+        if len(chunk) == _BATCH_CHUNK_SIZE or (len(chunk) + 1) * (term * 12 + 1) > _BATCH_CHUNK_MONTHS:
+            yield pending.pop(term)
+    yield from pending.values()
+
+
+def _add_monthly_totals(totals, group, first_index, values):
+    """
+    Adds values (one row per PORTFOLIO_COLUMNS money/count column, one column per month from month_index
+    first_index) to the running totals of group, widening its month range as needed.
+    """
+    if group not in totals:
+        totals[group] = (first_index, values)
+        return
+    current_first, current = totals[group]
+    new_first = min(current_first, first_index)
+    new_last = max(current_first + current.shape[1], first_index + values.shape[1])
+    combined = np.zeros((values.shape[0], new_last - new_first))
+    combined[:, current_first - new_first:current_first - new_first + current.shape[1]] += current
+    combined[:, first_index - new_first:first_index - new_first + values.shape[1]] += values
+    totals[group] = (new_first, combined)
+
+
+def scenario_grid(axes, **fixed):
+    """
+    Expands a grid of loan scenarios for Loan.calculate_many.
+    axes maps Loan.calculate argument names to lists of values; every combination is produced,
+    each merged with the fixed arguments.
+    """
+    names = list(axes)
+    return [dict(fixed, **dict(zip(names, values))) for values in itertools.product(*axes.values())]
 
 
 class Loan:
@@ -18,13 +567,294 @@ class Loan:
         self.payoff_month = None  # Month when loan is paid off
         self.payoff_year = None  # Year when loan is paid off
 
-        self.df = pd.DataFrame()
+        self.schedule = _EMPTY_SCHEDULE
+
+    @property
+    def df(self):
+        """The amortization schedule as a pandas DataFrame (imports pandas on first use)."""
+        return self.schedule.to_dataframe()
 
     def calculate(
         self, price, down_percentage, term, rate, start_month, start_year,
+        monthly_extra_payment=0, yearly_extra_payment=0, one_time_payments=None,
+        engine='numpy'
+    ):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Choose one of: {', '.join(ENGINES)}.")
+
+        monthly_rate, num_payments_original_term = self._set_terms(
+            price, down_percentage, term, rate, start_month, start_year
+        )
+
+        if one_time_payments is None:
+            one_time_payments = []
+
+        # Special handling for loans with 0 principal or 0 term (already paid off at start)
+        if self.principal <= 0 or num_payments_original_term == 0:
+            # Create a minimal schedule for 0 principal loan
+            self.schedule = Schedule.from_records([self._set_paid_off_at_start()])
+            return LoanResult(self.tp, self.total, self.schedule, self.payoff_month, self.payoff_year)
+
+        if engine == 'numpy':
+            self._amortize_numpy(
+                monthly_rate, num_payments_original_term,
+                monthly_extra_payment, yearly_extra_payment, one_time_payments
+            )
+        else:
+            self._amortize_loop(
+                monthly_rate, num_payments_original_term,
+                monthly_extra_payment, yearly_extra_payment, one_time_payments
+            )
+
+        return LoanResult(self.tp, self.total, self.schedule, self.payoff_month, self.payoff_year)
+
+    def recalculate(
+        self, previous_schedule, changed_month, price, down_percentage, term, rate, start_month, start_year,
+        monthly_extra_payment=0, yearly_extra_payment=0, one_time_payments=None,
+        engine='numpy'
+    ):
+        """
+        Like calculate, for a loan whose previous_schedule was calculated with the same terms and the same
+        payments before payment month changed_month (see first_changed_month). The schedule rows before
+        changed_month are reused and only the months from changed_month onward are recomputed, so the
+        work saved grows with the number of reused months (most for the loop engine, whose cost is per month).
+        Returns a LoanResult.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Choose one of: {', '.join(ENGINES)}.")
+
+        monthly_rate, num_payments_original_term = self._set_terms(
+            price, down_percentage, term, rate, start_month, start_year
+        )
+
+        if one_time_payments is None:
+            one_time_payments = []
+
+        # Nothing but the inception row could be reused
+        if self.principal <= 0 or num_payments_original_term == 0 or changed_month <= 1:
+            return self.calculate(
+                price, down_percentage, term, rate, start_month, start_year,
+                monthly_extra_payment, yearly_extra_payment, one_time_payments,
+                engine=engine
+            )
+
+        started = time.perf_counter()
+        if changed_month >= len(previous_schedule):
+            # The loan was paid off before the first changed payment
+            self.schedule = previous_schedule
+        else:
+            start_index = month_index(start_year, start_month)
+            horizon = num_payments_original_term + 1  # Same extended period as the engines
+
+            # Extra payments from changed_month to the end of the horizon
+            extras = np.full(horizon - changed_month + 1, float(monthly_extra_payment))
+            first_january = (-start_index - changed_month) % 12  # Index of the first January in extras
+            extras[first_january::12] += yearly_extra_payment
+            for offset, amount in _index_one_time_payments(one_time_payments, start_index).items():
+                if changed_month <= offset <= horizon:
+                    extras[offset - changed_month] += amount
+
+            # Schedule state after the last unchanged month
+            principal_paid, interest_paid, balance, total_paid = (
+                float(previous_schedule[column][changed_month - 1]) for column in SCHEDULE_COLUMNS[4:]
+            )
+            if engine == 'loop' or _loan_needs_loop(monthly_rate, num_payments_original_term, extras.min()):
+                rows = _amortize_tail(balance, monthly_rate, self.tp, extras, principal_paid, interest_paid, total_paid)
+                columns = list(np.array(rows, dtype=float).reshape(len(rows), 6).T)
+            else:
+                columns = _continue_amortization(
+                    balance, monthly_rate, self.tp, extras, principal_paid, interest_paid, total_paid
+                )
+
+            periods = start_index + np.arange(changed_month, changed_month + len(columns[0]))
+            columns = [periods % 12 + 1, periods // 12] + columns
+            self.schedule = Schedule({
+                name: np.concatenate((previous_schedule[name][:changed_month], column))
+                for name, column in zip(SCHEDULE_COLUMNS, columns)
+            })
+        _report_stage('calculate', started, len(self.schedule))
+
+        self.total = float(self.schedule['Total Amount Paid'][-1])
+        if self.schedule['Loan Balance'][-1] <= 0:
+            self.payoff_month = int(self.schedule['Month'][-1])
+            self.payoff_year = int(self.schedule['Year'][-1])
+        return LoanResult(self.tp, self.total, self.schedule, self.payoff_month, self.payoff_year)
+
+    def iter_schedule(
+        self, price, down_percentage, term, rate, start_month, start_year,
+        monthly_extra_payment=0, yearly_extra_payment=0, one_time_payments=None
+    ):
+        """
+        Like calculate, but returns a generator yielding the amortization schedule one row (a dict keyed by
+        SCHEDULE_COLUMNS) at a time as it is computed, without building a Schedule.
+        self.tp is set when this returns; self.total and the payoff date once the generator is exhausted.
+        """
+        monthly_rate, num_payments_original_term = self._set_terms(
+            price, down_percentage, term, rate, start_month, start_year
+        )
+
+        if one_time_payments is None:
+            one_time_payments = []
+
+        if self.principal <= 0 or num_payments_original_term == 0:
+            return iter([self._set_paid_off_at_start()])
+
+        return self._iter_rows(
+            monthly_rate, num_payments_original_term,
+            monthly_extra_payment, yearly_extra_payment, one_time_payments
+        )
+
+    def summarize(
+        self, price, down_percentage, term, rate, start_month, start_year,
+        monthly_extra_payment=0, yearly_extra_payment=0, one_time_payments=None
+    ):
+        """
+        Like calculate, but returns a LoanSummary without building the amortization schedule.
+        The balance is followed in closed form between yearly and one-time payments (so with no
+        extras, or only a monthly extra, the whole term is a single step). Negative extra payments
+        and very high compound growth fall back to a month-by-month loop that records no rows, as
+        the loop engine does. self.schedule is left unchanged.
+        """
+        monthly_rate, num_payments_original_term = self._set_terms(
+            price, down_percentage, term, rate, start_month, start_year
+        )
+
+        if one_time_payments is None:
+            one_time_payments = []
+
+        if self.principal <= 0 or num_payments_original_term == 0:
+            self._set_paid_off_at_start()
+            return LoanSummary(self.tp, self.total, 0.0, self.payoff_month, self.payoff_year, 0)
+
+        start_index = month_index(start_year, start_month)
+        one_time_payments_by_offset = _index_one_time_payments(one_time_payments, start_index)
+        args = (
+            self.principal, monthly_rate, self.tp, num_payments_original_term, start_index,
+            monthly_extra_payment, yearly_extra_payment, one_time_payments_by_offset
+        )
+        lowest_extra = min(monthly_extra_payment, yearly_extra_payment, *one_time_payments_by_offset.values())
+        if _loan_needs_loop(monthly_rate, num_payments_original_term, lowest_extra):
+            months, self.total, interest_paid = _summarize_months(*args)
+        else:
+            months, self.total, interest_paid = _summarize_closed_form(*args)
+
+        if months is None:
+            self.payoff_month, self.payoff_year = None, None
+            return LoanSummary(self.tp, self.total, interest_paid, None, None, None)
+        self.payoff_month, self.payoff_year = month_and_year(start_index + months)
+        return LoanSummary(
+            self.tp, self.total, interest_paid, self.payoff_month, self.payoff_year,
+            num_payments_original_term - months
+        )
+
+    def solve_extra_payment(
+        self, price, down_percentage, term, rate, start_month, start_year,
+        target_month=None, target_year=None, target_total_interest=None, frequency='monthly',
         monthly_extra_payment=0, yearly_extra_payment=0, one_time_payments=None
     ):
+        """
+        Finds the smallest extra payment, in whole cents, that pays the loan off by target_month/target_year
+        or keeps the total interest at or below target_total_interest. The payment is made every month
+        (frequency='monthly') or every January ('yearly') and replaces monthly_extra_payment or
+        yearly_extra_payment; the other extra payments are kept as given.
+
+        No schedule is built. A monthly payment towards a payoff date with no other extras is solved in
+        closed form; anything else by bisection over the summary-only month-by-month recurrence.
+        Returns an ExtraPaymentSolution. Raises ValueError for invalid or unreachable targets.
+        """
+        if frequency not in EXTRA_PAYMENT_FREQUENCIES:
+            raise ValueError(
+                f"Unknown frequency '{frequency}'. Choose one of: {', '.join(EXTRA_PAYMENT_FREQUENCIES)}."
+            )
+        by_date = target_month is not None or target_year is not None
+        if by_date == (target_total_interest is not None):
+            raise ValueError("Give either a target payoff month and year or a target total interest.")
+        if by_date and (target_month is None or target_year is None):
+            raise ValueError("A target payoff date needs both a month and a year.")
+        if by_date and not 1 <= target_month <= 12:
+            raise ValueError("Target payoff month must be between 1 and 12.")
+
+        monthly_rate, num_payments_original_term = self._set_terms(
+            price, down_percentage, term, rate, start_month, start_year
+        )
+
+        if one_time_payments is None:
+            one_time_payments = []
+
+        if self.principal <= 0 or num_payments_original_term == 0:
+            self._set_paid_off_at_start()
+            return ExtraPaymentSolution(
+                0.0, frequency, self.tp, self.total, 0.0, self.payoff_month, self.payoff_year
+            )
 
+        start_index = month_index(start_year, start_month)
+        one_time_payments_by_offset = _index_one_time_payments(one_time_payments, start_index)
+        if by_date:
+            target_months = month_index(target_year, target_month) - start_index
+            if target_months < 1:
+                raise ValueError("Target payoff date must be after the loan start.")
+
+        def summarize(cents):
+            extra_payment = cents / 100
+            return _summarize_months(
+                self.principal, monthly_rate, self.tp, num_payments_original_term, start_index,
+                extra_payment if frequency == 'monthly' else monthly_extra_payment,
+                extra_payment if frequency == 'yearly' else yearly_extra_payment,
+                one_time_payments_by_offset
+            )
+
+        def meets_target(cents):
+            months, _, interest_paid = summarize(cents)
+            if months is None:
+                return False
+            if by_date:
+                return months <= target_months
+            return interest_paid <= target_total_interest
+
+        if meets_target(0):
+            cents = 0
+        else:
+            # Paying off the balance with interest at the first opportunity (within 12 months for a
+            # yearly payment) reaches any reachable target, so it bounds the search
+            months_to_first_payment = 1 if frequency == 'monthly' else 12
+            upper = math.ceil(self.principal * math.pow(1 + monthly_rate, months_to_first_payment) * 100) + 1
+            if not meets_target(upper):
+                raise ValueError(f"The target cannot be reached with a {frequency} extra payment.")
+
+            lower = 0  # Largest amount known to miss the target
+            if by_date and frequency == 'monthly' and not yearly_extra_payment and not one_time_payments_by_offset:
+                # Paying off in target_months months takes exactly the annuity payment over that period
+                payment = _annuity_payment(self.principal, monthly_rate, target_months)
+                estimate = min(max(math.ceil((payment - self.tp) * 100), 1), upper)
+                if meets_target(estimate):
+                    upper = estimate
+                    if meets_target(estimate - 1):  # Rounding up and the payoff tolerance can overshoot
+                        upper = estimate - 1
+                    else:
+                        lower = estimate - 1
+                else:
+                    lower = estimate
+            while upper - lower > 1:
+                middle = (lower + upper) // 2
+                if meets_target(middle):
+                    upper = middle
+                else:
+                    lower = middle
+            cents = upper
+
+        months, self.total, interest_paid = summarize(cents)
+        self.payoff_month, self.payoff_year = month_and_year(start_index + months)
+        return ExtraPaymentSolution(
+            cents / 100, frequency, self.tp, self.total, interest_paid, self.payoff_month, self.payoff_year
+        )
+
+    def _set_terms(self, price, down_percentage, term, rate, start_month, start_year):
+        """
+        Stores the loan terms and the base monthly payment.
+        Returns the monthly rate and the number of payments over the original term.
+        Raises ValueError for a negative term or a start month/year outside the calendar.
+        """
+        _check_terms(term, start_month, start_year)
         self.price = price
         self.down = down_percentage / 100
         self.principal = price * (1 - self.down)
@@ -33,9 +863,6 @@ class Loan:
         self.start_month = start_month
         self.start_year = start_year
 
-        if one_time_payments is None:
-            one_time_payments = []
-
         monthly_rate = self.rate / 12
         num_payments_original_term = term * 12  # Max possible payments based on original term
 
@@ -49,24 +876,45 @@ class Loan:
             if num_payments_original_term == 0:  # Handle 0 term
                 self.tp = 0
             else:
-                self.tp = (
-                        self.principal
-                        * monthly_rate
-                        * math.pow(1 + monthly_rate, num_payments_original_term)
-                        / (math.pow(1 + monthly_rate, num_payments_original_term) - 1)
-                )
+                self.tp = _annuity_payment(self.principal, monthly_rate, num_payments_original_term)
+
+        return monthly_rate, num_payments_original_term
 
-        # Define DataFrame columns, including Month and Year
-        columns = [
-            'Month', 'Year', 'Principal Payment', 'Interest Payment',
-            'Principal Paid', 'Interest Paid', 'Loan Balance', 'Total Amount Paid'
-        ]
+    def _set_paid_off_at_start(self):
+        """Records a loan that is paid off at its start (0 principal or 0 term). Returns its only schedule row."""
+        self.payoff_month = self.start_month
+        self.payoff_year = self.start_year
+        self.total = 0.0
+        self.tp = 0.0
+        return {
+            'Month': self.start_month, 'Year': self.start_year,
+            'Principal Payment': 0.0, 'Interest Payment': 0.0,
+            'Principal Paid': 0.0, 'Interest Paid': 0.0,
+            'Loan Balance': 0.0, 'Total Amount Paid': 0.0
+        }
 
-        # We will build the DataFrame row by row to accurately capture early payoff
-        data = []
+    def _amortize_loop(
+        self, monthly_rate, num_payments_original_term,
+        monthly_extra_payment, yearly_extra_payment, one_time_payments
+    ):
+        """Builds the schedule one month at a time. Sets self.schedule, self.total and the payoff date."""
+        # We will build the schedule row by row to accurately capture early payoff
+        started = time.perf_counter()
+        data = list(self._iter_rows(
+            monthly_rate, num_payments_original_term,
+            monthly_extra_payment, yearly_extra_payment, one_time_payments
+        ))
+        started = _report_stage('calculate', started, len(data))
+        self.schedule = Schedule.from_records(data)
+        _report_stage('schedule', started, len(data))
 
+    def _iter_rows(
+        self, monthly_rate, num_payments_original_term,
+        monthly_extra_payment, yearly_extra_payment, one_time_payments
+    ):
+        """Yields schedule rows one month at a time. Sets self.total and the payoff date when done."""
         # Add initial row for month 0 (loan inception)
-        data.append({
+        yield {
             'Month': self.start_month,
             'Year': self.start_year,
             'Principal Payment': 0.0,
@@ -75,15 +923,19 @@ class Loan:
             'Interest Paid': 0.0,
             'Loan Balance': self.principal,
             'Total Amount Paid': 0.0
-        })
+        }
 
         current_loan_balance = self.principal
         principal_paid_total = 0
         interest_paid_total = 0
         cumulative_total_paid = 0
 
-        # Start tracking current date from the input start month/year
-        current_date = datetime(self.start_year, self.start_month, 1)
+        # One-time payment totals keyed by month offset, so each month needs a single lookup
+        start_index = month_index(self.start_year, self.start_month)
+        one_time_payments_by_offset = _index_one_time_payments(one_time_payments, start_index)
+
+        # Track the current month as an integer month index, starting from the input start month/year
+        current_index = start_index
 
         # Loop for a slightly extended period than the original term to ensure final payment is captured,
         # but will break early if loan is paid off.
@@ -91,103 +943,350 @@ class Loan:
         for i in range(1, num_payments_original_term + 2):
             # Break if loan is already paid off from previous month's calculations
             if current_loan_balance <= 0:
-                self.payoff_month = current_date.month
-                self.payoff_year = current_date.year
+                self.payoff_month, self.payoff_year = month_and_year(current_index)
                 break
 
-                # Move to the next month for the current payment period
-            current_date += timedelta(days=32)  # Go to next month, then adjust to 1st
-            current_date = current_date.replace(day=1)
+            # Move to the next month for the current payment period
+            current_index += 1
 
             # Calculate interest for the current month based on the beginning balance
             interest_for_month = current_loan_balance * monthly_rate
 
-            # Regular principal payment from the base monthly payment
-            regular_principal_payment = self.tp - interest_for_month
-
-            # Ensure regular principal payment does not exceed the current balance
-            regular_principal_payment = min(regular_principal_payment, current_loan_balance)
-
             # --- Apply extra payments for this month ---
             extra_principal_payment_this_month = 0
 
             # Monthly extra payment
             extra_principal_payment_this_month += monthly_extra_payment
 
-            # Yearly extra payment (assuming made in January, i.e., current_date.month == 1)
-            if current_date.month == 1:
+            # Yearly extra payment (assuming made in January, i.e., current_index % 12 == 0)
+            if current_index % 12 == 0:
                 extra_principal_payment_this_month += yearly_extra_payment
 
-            # One-time payments for this specific month/year
-            payments_applied_this_month = []
-            # Iterate through a copy or by index to safely remove applied payments
-            for op_idx, op in enumerate(list(one_time_payments)):  # Use list() to iterate over a copy
-                if op['month'] == current_date.month and op['year'] == current_date.year:
-                    extra_principal_payment_this_month += op['amount']
-                    payments_applied_this_month.append(op)  # Store payment to remove it later
-
-            # Remove applied one-time payments from the original list
-            for op in payments_applied_this_month:
-                one_time_payments.remove(op)
-
-            # Total principal reduction for this month (regular + all extra payments)
-            total_principal_reduction = regular_principal_payment + extra_principal_payment_this_month
+            # One-time payments for this specific month/year (i months after the start)
+            extra_principal_payment_this_month += one_time_payments_by_offset.get(i, 0)
 
-            # Ensure total principal reduction does not cause the loan balance to go excessively negative
-            actual_principal_payment_this_month = min(total_principal_reduction, current_loan_balance)
-
-            # Actual total cash paid out this month (base payment + extra payments)
-            actual_total_cash_out_this_month = self.tp + extra_principal_payment_this_month
-
-            # Adjust if the total principal reduction was capped
-            if total_principal_reduction > current_loan_balance:
-                # If total payments overpaid, the final payment is just remaining balance + interest
-                actual_total_cash_out_this_month = interest_for_month + current_loan_balance
+            # Principal reduction (regular + all extra payments) and cash paid out this month
+            actual_principal_payment_this_month, actual_total_cash_out_this_month = _apply_payment(
+                current_loan_balance, interest_for_month, self.tp, extra_principal_payment_this_month
+            )
 
             current_loan_balance -= actual_principal_payment_this_month
-            current_loan_balance = max(0, current_loan_balance)  # Ensure loan balance doesn't become negative
+            if current_loan_balance < _BALANCE_TOLERANCE:  # Ensure loan balance doesn't become negative
+                current_loan_balance = 0.0
 
             principal_paid_total += actual_principal_payment_this_month
             interest_paid_total += interest_for_month
             cumulative_total_paid += actual_total_cash_out_this_month
 
-            data.append({
-                'Month': current_date.month,
-                'Year': current_date.year,
+            current_month, current_year = month_and_year(current_index)
+            yield {
+                'Month': current_month,
+                'Year': current_year,
                 'Principal Payment': actual_principal_payment_this_month,
                 'Interest Payment': interest_for_month,
                 'Principal Paid': principal_paid_total,
                 'Interest Paid': interest_paid_total,
                 'Loan Balance': current_loan_balance,
                 'Total Amount Paid': cumulative_total_paid
-            })
+            }
 
             # If loan balance is zero or less after this month's payment, record payoff date and break
             if current_loan_balance <= 0:
-                self.payoff_month = current_date.month
-                self.payoff_year = current_date.year
+                self.payoff_month, self.payoff_year = current_month, current_year
                 break
 
-        self.df = pd.DataFrame(data, columns=columns)
         self.total = cumulative_total_paid  # Final cumulative total paid over the actual loan term
 
-        # Special handling for loans with 0 principal or 0 term (already paid off at start)
-        if self.principal <= 0 or num_payments_original_term == 0:
-            self.payoff_month = self.start_month
-            self.payoff_year = self.start_year
-            self.total = 0.0
-            self.tp = 0.0
-            self.df = pd.DataFrame(data=[{  # Create a minimal DataFrame for 0 principal loan
-                'Month': self.start_month, 'Year': self.start_year,
-                'Principal Payment': 0.0, 'Interest Payment': 0.0,
-                'Principal Paid': 0.0, 'Interest Paid': 0.0,
-                'Loan Balance': 0.0, 'Total Amount Paid': 0.0
-            }], columns=columns)
+    def _amortize_numpy(
+        self, monthly_rate, num_payments_original_term,
+        monthly_extra_payment, yearly_extra_payment, one_time_payments
+    ):
+        """
+        Builds the schedule with NumPy arrays. Sets self.schedule, self.total and the payoff date.
+
+        Balances are exact only while no payment is capped by the balance, so the month where the
+        balance first reaches zero (and any after it) is finished with the scalar loop.
+        """
+        started = time.perf_counter()
+        horizon = num_payments_original_term + 1  # Same extended period as the loop engine
+        if horizon > _BATCH_CHUNK_MONTHS:
+            # Arrays this long cost more than the loop, which only holds the months until payoff
+            return self._amortize_loop(
+                monthly_rate, num_payments_original_term,
+                monthly_extra_payment, yearly_extra_payment, one_time_payments
+            )
+        start_index = month_index(self.start_year, self.start_month)
+        periods = start_index + np.arange(horizon + 1)  # Includes the inception row
+
+        principal = np.array([self.principal], dtype=float)
+        rate = np.array([monthly_rate], dtype=float)
+        num_payments = np.array([num_payments_original_term])
+        extras = _extra_payments(
+            np.array([start_index]), horizon, [monthly_extra_payment], [yearly_extra_payment], [one_time_payments]
+        )
+        if _needs_loop(rate, num_payments, extras)[0]:
+            return self._amortize_loop(
+                monthly_rate, num_payments_original_term,
+                monthly_extra_payment, yearly_extra_payment, one_time_payments
+            )
+        extras = extras[0]
+        balance = _uncapped_balances(principal, rate, num_payments, extras[None, :])[0]
+
+        # Months before the first one whose payment reaches the balance are computed vectorized
+        capped = np.flatnonzero(balance < _BALANCE_TOLERANCE)
+        first_capped = capped[0] if len(capped) else horizon
+
+        balance = balance[:first_capped]
+        opening_balance = np.concatenate(([self.principal], balance[:-1])) if first_capped else balance
+        interest = opening_balance * monthly_rate
+        principal_payments = opening_balance - balance
+        interest_paid = np.cumsum(interest)
+        total_paid = np.cumsum(self.tp + extras[:first_capped])
+        principal_paid = self.principal - balance
+
+        # Finish the remaining months one at a time, as the loop engine does
+        if first_capped:
+            tail = _amortize_tail(
+                balance[-1], monthly_rate, self.tp, extras[first_capped:],
+                principal_paid[-1], interest_paid[-1], total_paid[-1]
+            )
+        else:
+            tail = _amortize_tail(self.principal, monthly_rate, self.tp, extras, 0.0, 0.0, 0.0)
+
+        num_rows = 1 + first_capped + len(tail)
+        tail = np.array(tail, dtype=float).reshape(len(tail), 6)
+        periods = periods[:num_rows]
+        started = _report_stage('calculate', started, num_rows)
+        self.schedule = Schedule({
+            'Month': periods % 12 + 1,
+            'Year': periods // 12,
+            'Principal Payment': np.concatenate(([0.0], principal_payments, tail[:, 0])),
+            'Interest Payment': np.concatenate(([0.0], interest, tail[:, 1])),
+            'Principal Paid': np.concatenate(([0.0], principal_paid, tail[:, 2])),
+            'Interest Paid': np.concatenate(([0.0], interest_paid, tail[:, 3])),
+            'Loan Balance': np.concatenate(([self.principal], balance, tail[:, 4])),
+            'Total Amount Paid': np.concatenate(([0.0], total_paid, tail[:, 5])),
+        })
+        _report_stage('schedule', started, num_rows)
+        self.total = float(tail[-1, 5]) if len(tail) else float(total_paid[-1])  # Final cumulative total paid
+
+        if len(tail) and tail[-1, 4] <= 0:
+            self.payoff_month, self.payoff_year = month_and_year(int(periods[-1]))
+
+    @classmethod
+    def calculate_many(cls, scenarios, include_schedule=False):
+        """
+        Prices many loan scenarios together, one row per scenario in 2-D NumPy arrays, in chunks of
+        scenarios with the same term.
 
-        return self.tp, self.total, self.df, self.payoff_month, self.payoff_year
+        Each scenario is a dict of Loan.calculate keyword arguments (see scenario_grid for grids).
+        Returns one dict per scenario with monthly_payment, total_amount_paid, total_interest,
+        payoff_month and payoff_year; with include_schedule it also holds the amortization_schedule
+        Schedule.
+        """
+        scenarios = list(scenarios)
+        results = [None] * len(scenarios)
+        for positions, chunk in _term_chunks(scenarios):
+            if include_schedule or chunk[0]['term'] * 12 + 1 > _BATCH_CHUNK_MONTHS:
+                chunk_results = cls._calculate_each(chunk, include_schedule)
+            else:
+                chunk_results = cls._summarize_chunk(chunk)
+            for position, result in zip(positions, chunk_results):
+                results[position] = result
+        return results
+
+    @classmethod
+    def _calculate_each(cls, scenarios, include_schedule):
+        """Prices scenarios one at a time with Loan.calculate."""
+        results = []
+        for scenario in scenarios:
+            loan = cls()
+            monthly_payment, total_amount_paid, schedule, payoff_month, payoff_year = loan.calculate(**scenario)
+            result = {
+                'monthly_payment': monthly_payment,
+                'total_amount_paid': total_amount_paid,
+                'total_interest': float(schedule['Interest Paid'][-1]),
+                'payoff_month': payoff_month,
+                'payoff_year': payoff_year,
+            }
+            if include_schedule:
+                result['amortization_schedule'] = schedule
+            results.append(result)
+        return results
+
+    @classmethod
+    def _summarize_chunk(cls, scenarios):
+        """Prices a chunk of scenarios without building schedules."""
+        (
+            principal, monthly_rate, num_payments, start_index, base_payment, extras, degenerate, use_loop, balance
+        ) = _chunk_balances(scenarios)
+
+        opening_balance = np.concatenate((principal[:, None], balance[:, :-1]), axis=1)
+        interest_paid = np.cumsum(opening_balance * monthly_rate[:, None], axis=1)
+        total_paid = np.cumsum(base_payment[:, None] + extras, axis=1)
+        first_capped = np.argmax(balance < _BALANCE_TOLERANCE, axis=1)  # Always within the term
+
+        results = []
+        for row, scenario in enumerate(scenarios):
+            if use_loop[row]:
+                results.extend(cls._calculate_each([scenario], include_schedule=False))
+                continue
+            if degenerate[row]:
+                results.append({
+                    'monthly_payment': 0.0, 'total_amount_paid': 0.0, 'total_interest': 0.0,
+                    'payoff_month': scenario['start_month'], 'payoff_year': scenario['start_year'],
+                })
+                continue
+
+            first = first_capped[row]
+            if first:
+                tail = _amortize_tail(
+                    balance[row, first - 1], monthly_rate[row], base_payment[row],
+                    extras[row, first:num_payments[row] + 1], principal[row] - balance[row, first - 1],
+                    interest_paid[row, first - 1], total_paid[row, first - 1]
+                )
+            else:
+                tail = _amortize_tail(
+                    principal[row], monthly_rate[row], base_payment[row],
+                    extras[row, :num_payments[row] + 1], 0.0, 0.0, 0.0
+                )
+            payoff_month, payoff_year = month_and_year(int(start_index[row] + first + len(tail)))
+            paid_off = tail[-1][4] <= 0
+            results.append({
+                'monthly_payment': float(base_payment[row]),
+                'total_amount_paid': float(tail[-1][5]),
+                'total_interest': float(tail[-1][3]),
+                'payoff_month': payoff_month if paid_off else None,
+                'payoff_year': payoff_year if paid_off else None,
+            })
+        return results
+
+    @classmethod
+    def project_portfolio(cls, scenarios, group_by=None, rate_bucket=0.5):
+        """
+        Projects the combined cash flows of many loans per calendar month, as if their schedules were merged
+        on Month and Year and summed, without keeping any individual schedule. Scenarios are priced in chunks
+        of 2-D NumPy arrays with the same term (as in calculate_many) and added straight into month-indexed
+        totals, so time grows linearly with the number of loans and memory with the length of the projection.
+
+        Each scenario is a dict of Loan.calculate keyword arguments. group_by is None (one group), 'term'
+        (grouped by term in years) or 'rate' (grouped by annual rate buckets rate_bucket percentage points
+        wide, labelled by their lower bound). Returns a dict mapping each group label (None when not grouped)
+        to a dict of PORTFOLIO_COLUMNS arrays covering every month from the group's first start to its last payoff.
+        """
+        if group_by not in PORTFOLIO_GROUPINGS:
+            raise ValueError(
+                f"Unknown grouping '{group_by}'. Choose one of: {', '.join(str(g) for g in PORTFOLIO_GROUPINGS)}."
+            )
+        if group_by == 'rate' and not rate_bucket > 0:
+            raise ValueError("Rate bucket width must be positive.")
+
+        totals = {}  # group -> (first month_index, array of monthly totals)
+        for _, chunk in _term_chunks(scenarios):
+            cls._project_chunk(chunk, group_by, rate_bucket, totals)
 
+        projection = {}
+        for group, (first_index, values) in totals.items():
+            periods = first_index + np.arange(values.shape[1])
+            columns = {'Month': periods % 12 + 1, 'Year': periods // 12}
+            columns.update(zip(PORTFOLIO_COLUMNS[2:6], values[:4]))
+            columns['Active Loans'] = np.rint(values[4]).astype(np.int64)
+            projection[group] = columns
+        return projection
 
-def main():
+    @classmethod
+    def _project_chunk(cls, scenarios, group_by, rate_bucket, totals):
+        """Adds a chunk of scenarios' monthly cash flows to totals (see project_portfolio)."""
+        (
+            principal, monthly_rate, num_payments, start_index, base_payment, extras, degenerate, use_loop, balance
+        ) = _chunk_balances(scenarios)
+        num_loans, horizon = extras.shape
+
+        if group_by == 'term':
+            labels = [int(s['term']) for s in scenarios]
+        elif group_by == 'rate':
+            labels = [round(math.floor(s['rate'] / rate_bucket) * rate_bucket, 10) for s in scenarios]
+        else:
+            labels = [None] * num_loans
+        group_ids_by_label = {label: group_id for group_id, label in enumerate(dict.fromkeys(labels))}
+        groups = list(group_ids_by_label)
+        group_ids = np.array([group_ids_by_label[label] for label in labels])
+
+        # Month 0 is the inception row (balance = principal, no payments); month j > 0 is the j-th payment.
+        # Payments are uncapped until first_capped, the month whose payment reaches the balance and pays it off.
+        months = np.arange(horizon + 1)
+        first_capped = np.argmax(balance < _BALANCE_TOLERANCE, axis=1)  # Always within the term
+        payoff = np.where(degenerate, 0, first_capped + 1)[:, None]
+        opening_balance = np.concatenate((principal[:, None], balance[:, :-1]), axis=1)
+        interest = opening_balance * monthly_rate[:, None]
+
+        # Cash paid in the payoff month, by the same rule as _apply_payment
+        rows = np.arange(num_loans)
+        final_balance = opening_balance[rows, first_capped]
+        final_interest = interest[rows, first_capped]
+        final_extra = extras[rows, first_capped]
+        overpaid = np.minimum(base_payment - final_interest, final_balance) + final_extra > final_balance
+        final_payment = np.where(overpaid, final_interest + final_balance, base_payment + final_extra)
+
+        paid = (months[1:] < payoff)  # Uncapped payment months
+        is_final = (months[1:] == payoff)
+        values = np.zeros((5, num_loans, horizon + 1))
+        values[0, :, 1:] = np.where(paid, opening_balance - balance, np.where(is_final, opening_balance, 0.0))
+        values[1, :, 1:] = np.where(paid | is_final, interest, 0.0)
+        values[2, :, 1:] = np.where(
+            paid, base_payment[:, None] + extras, np.where(is_final, final_payment[:, None], 0.0)
+        )
+        values[3, :, 0] = np.where(degenerate, 0.0, principal)
+        values[3, :, 1:] = np.where(paid, balance, 0.0)
+        values[4] = months <= payoff
+
+        # Rows only the loop engine can price are replaced by their calculated schedules
+        for row in np.flatnonzero(use_loop):
+            schedule = cls().calculate(**scenarios[row]).amortization_schedule
+            length = len(schedule)
+            values[:, row] = 0.0
+            values[0, row, :length] = schedule['Principal Payment']
+            values[1, row, :length] = schedule['Interest Payment']
+            values[2, row, :length] = np.diff(schedule['Total Amount Paid'], prepend=0.0)
+            values[3, row, :length] = schedule['Loan Balance']
+            values[4, row, :length] = 1.0
+
+        # Sum each group's loans by calendar month with one bincount per column
+        first_index = int(start_index.min())
+        span = int(start_index.max()) - first_index + horizon + 1
+        positions = (group_ids * span)[:, None] + (start_index - first_index)[:, None] + months
+        for group_id, group in enumerate(groups):
+            in_group = group_ids == group_id
+            group_positions = positions[in_group].ravel() - group_id * span
+            monthly = np.stack([
+                np.bincount(group_positions, weights=column[in_group].ravel(), minlength=span) for column in values
+            ])
+            # Trim months after the group's last active loan
+            last = np.flatnonzero(monthly[4])[-1] + 1
+            _add_monthly_totals(totals, group, first_index, monthly[:, :last])
+
+
+def amortize(
+    price, down_percentage, term, rate, start_month, start_year,
+    monthly_extra_payment=0, yearly_extra_payment=0, one_time_payments=None,
+    engine='numpy'
+):
+    """
+    Stateless loan calculation. Takes the same arguments as Loan.calculate and returns a LoanResult
+    without sharing any state between calls, so it is safe to run from several threads or processes.
+    """
+    return Loan().calculate(
+        price, down_percentage, term, rate, start_month, start_year,
+        monthly_extra_payment, yearly_extra_payment, one_time_payments,
+        engine=engine
+    )
+
+
+def main(show_schedule=True):
+    """
+    Interactive calculator. With show_schedule=False (python main.py --summary) only the summary is printed
+    and no schedule is built; the prompts are the same either way, so scripted input works with both.
+    """
     while True:
         print("\nDo you want to:")
         print("(1) Calculate your loan payments")
@@ -299,11 +1398,18 @@ def main():
                     one_time_payments.append({'amount': ot_amount, 'month': ot_month, 'year': ot_year})
 
                 loan = Loan()
-                # Unpack all return values from calculate()
-                monthly_payment, total_amount_paid, amortization_schedule, payoff_month, payoff_year = \
-                    loan.calculate(price, down_payment_percentage, term, rate,
-                                   start_month, start_year,
-                                   monthly_extra_payment, yearly_extra_payment, one_time_payments)
+                if not show_schedule:
+                    # Summary only: no schedule is built
+                    summary = loan.summarize(price, down_payment_percentage, term, rate,
+                                             start_month, start_year,
+                                             monthly_extra_payment, yearly_extra_payment, one_time_payments)
+                    monthly_payment, total_amount_paid, _, payoff_month, payoff_year, months_saved = summary
+                else:
+                    # Unpack all return values from calculate()
+                    monthly_payment, total_amount_paid, amortization_schedule, payoff_month, payoff_year = \
+                        loan.calculate(price, down_payment_percentage, term, rate,
+                                       start_month, start_year,
+                                       monthly_extra_payment, yearly_extra_payment, one_time_payments)
 
                 print(f"\nYour estimated base monthly payment (Principal & Interest): ${monthly_payment:.2f}")
                 print(
@@ -316,9 +1422,16 @@ def main():
                 else:
                     print("Loan payoff date could not be determined.")
 
+                if not show_schedule:
+                    print(f"Total interest paid: ${summary.total_interest:.2f}")
+                    if months_saved:
+                        print(f"Months saved compared with the original term: {months_saved}")
+                    continue
+
                 print("\nAmortization Schedule:")
 
                 # Display the DataFrame intelligently for large schedules
+                amortization_schedule = amortization_schedule.to_dataframe()
                 if len(amortization_schedule) > 26:  # If more than 25 rows + header
                     print(amortization_schedule.head(13).to_string())  # Show first 12 months + header
                     print("...")
@@ -340,4 +1453,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Interactive loan calculator.")
+    parser.add_argument('--summary', action='store_true',
+                        help="print only the payment summary, without building or showing the schedule")
+    main(show_schedule=not parser.parse_args().summary)
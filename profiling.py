@@ -0,0 +1,134 @@
+import bisect
+import contextvars
+import threading
+import time
+
+# Upper bounds of the histogram buckets
+DURATION_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+ROW_BUCKETS = (1, 12, 60, 120, 180, 240, 360, 480, 600, 1200)
+
+# Stage timings of the request or worker call in progress, as a list of (stage, seconds, rows),
+# and the perf_counter value at which collection started
+_current_timings = contextvars.ContextVar('loan_stage_timings', default=None)
+_started = contextvars.ContextVar('loan_stage_started', default=None)
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus style. Safe to share between threads."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last count is the +Inf bucket
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.sum += value
+            self.count += 1
+
+    def render(self, name, labels):
+        """Returns the Prometheus text lines for this histogram's samples."""
+        with self._lock:
+            lines = []
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+            lines.append(f'{name}_count{{{labels}}} {self.count}')
+            return lines
+
+
+class StageMetrics:
+    """Duration and row-count histograms per stage."""
+
+    def __init__(self):
+        self.durations = {}
+        self.rows = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, rows=None):
+        with self._lock:
+            if stage not in self.durations:
+                self.durations[stage] = Histogram(DURATION_BUCKETS)
+            if rows is not None and stage not in self.rows:
+                self.rows[stage] = Histogram(ROW_BUCKETS)
+        self.durations[stage].observe(seconds)
+        if rows is not None:
+            self.rows[stage].observe(rows)
+
+    def render(self):
+        """Returns the Prometheus text lines for every stage."""
+        lines = [
+            "# HELP loan_stage_duration_seconds Time spent in each stage of a request.",
+            "# TYPE loan_stage_duration_seconds histogram",
+        ]
+        for stage, histogram in sorted(self.durations.items()):
+            lines.extend(histogram.render("loan_stage_duration_seconds", f'stage="{stage}"'))
+        lines.append("# HELP loan_stage_rows Schedule rows handled by each stage of a request.")
+        lines.append("# TYPE loan_stage_rows histogram")
+        for stage, histogram in sorted(self.rows.items()):
+            lines.extend(histogram.render("loan_stage_rows", f'stage="{stage}"'))
+        return lines
+
+
+def start_timings():
+    """Starts collecting stage timings in the current context. Returns a token for stop_timings."""
+    return _current_timings.set([]), _started.set(time.perf_counter())
+
+
+def stop_timings(token):
+    """Stops collecting stage timings. Returns the (stage, seconds, rows) tuples collected."""
+    timings = _current_timings.get()
+    timings_token, started_token = token
+    _current_timings.reset(timings_token)
+    _started.reset(started_token)
+    return timings
+
+
+def record_stage(stage, seconds, rows=None):
+    """Adds a stage timing to the current context's collection, if one was started."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds, rows))
+
+
+def record_since_start(stage_name):
+    """Records the time since collection started as a stage, if collection was started."""
+    started = _started.get()
+    if started is not None:
+        record_stage(stage_name, time.perf_counter() - started)
+
+
+def extend_timings(timings):
+    """Adds stage timings gathered elsewhere (e.g. in a worker) to the current context's collection."""
+    current = _current_timings.get()
+    if current is not None:
+        current.extend(timings)
+
+
+class stage:
+    """Context manager that records the duration of its block as a stage."""
+    __slots__ = ('name', 'rows', 'started')
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record_stage(self.name, time.perf_counter() - self.started, self.rows)
+
+
+def server_timing(timings):
+    """Formats stage timings as a Server-Timing header value, with durations in milliseconds."""
+    totals = {}
+    for stage_name, seconds, _ in timings:
+        totals[stage_name] = totals.get(stage_name, 0.0) + seconds
+    return ", ".join(f"{stage_name};dur={seconds * 1000:.3f}" for stage_name, seconds in totals.items())
@@ -12,8 +12,22 @@ document.addEventListener('DOMContentLoaded', () => {
     const messageBox = document.getElementById('messageBox');
     const messageText = document.getElementById('messageText');
     const closeMessageBoxBtn = document.getElementById('closeMessageBox');
+    const prevSchedulePageBtn = document.getElementById('prevSchedulePage');
+    const nextSchedulePageBtn = document.getElementById('nextSchedulePage');
+    const schedulePageInfo = document.getElementById('schedulePageInfo');
+
+    const SCHEDULE_PAGE_SIZE = 60; // Amortization rows loaded and displayed at a time
+    const SCHEDULE_FORMAT = 'cents'; // Compact column-wise schedule encoding requested from the API
+    const SCHEDULE_COLUMNS = [
+        'Month', 'Year', 'Principal Payment', 'Interest Payment',
+        'Principal Paid', 'Interest Paid', 'Loan Balance', 'Total Amount Paid'
+    ];
 
     let oneTimePaymentCounter = 0; // To keep track of one-time payment inputs
+    let currentPayload = null; // Last submitted loan, reused when paging through the schedule
+    let currentCalculationId = null; // Server handle of the last calculation, so edits reuse its unchanged months
+    let scheduleOffset = 0; // Index of the first displayed schedule row
+    let scheduleLength = 0; // Total number of schedule rows
 
     // Function to show a custom message box
     function showMessageBox(message) {
@@ -72,6 +86,113 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     });
 
+    // Convert an amortization_schedule in any API format ('records', 'columns', 'cents' or 'float64')
+    // to a list of row objects keyed by column name
+    function decodeSchedule(schedule, format) {
+        if (!format || format === 'records') {
+            return schedule;
+        }
+
+        let columns;
+        if (format === 'float64') {
+            // Column-major little-endian float64 values, base64-encoded
+            const bytes = Uint8Array.from(atob(schedule.data), c => c.charCodeAt(0));
+            const view = new DataView(bytes.buffer);
+            columns = {};
+            schedule.columns.forEach((name, col) => {
+                columns[name] = Array.from({ length: schedule.rows },
+                    (_, row) => view.getFloat64((col * schedule.rows + row) * 8, true));
+            });
+        } else {
+            columns = schedule; // 'columns' and 'cents' map each column name to its values
+        }
+
+        const rowCount = columns['Month'].length;
+        const rows = [];
+        for (let i = 0; i < rowCount; i++) {
+            const row = {};
+            SCHEDULE_COLUMNS.forEach((name, col) => {
+                const value = columns[name][i];
+                // Money columns (after Month and Year) arrive as integer cents in the 'cents' format
+                row[name] = format === 'cents' && col >= 2 ? value / 100 : value;
+            });
+            rows.push(row);
+        }
+        return rows;
+    }
+
+    // Fetch one page of the amortization schedule for the current loan and display it.
+    // Returns true if the page was loaded.
+    async function loadSchedulePage(offset) {
+        try {
+            let url = `/calculate?offset=${offset}&limit=${SCHEDULE_PAGE_SIZE}&format=${SCHEDULE_FORMAT}`;
+            if (currentCalculationId) {
+                url += `&base=${currentCalculationId}`;
+            }
+            const response = await fetch(url, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify(currentPayload)
+            });
+
+            if (!response.ok) {
+                const errorData = await response.json();
+                showMessageBox(`Error: ${errorData.detail || response.statusText}`);
+                return false;
+            }
+
+            const data = await response.json();
+            currentCalculationId = data.calculation_id;
+
+            // Display summary results
+            baseMonthlyPaymentSpan.textContent = `$${data.monthly_payment.toFixed(2)}`;
+            totalAmountPaidSpan.textContent = `$${data.total_amount_paid.toFixed(2)}`;
+            payoffDateSpan.textContent = data.payoff_date || 'N/A';
+
+            // Populate amortization table
+            const scheduleRows = decodeSchedule(data.amortization_schedule, data.schedule_format);
+            amortizationTableBody.innerHTML = '';
+            scheduleRows.forEach(row => {
+                const tr = document.createElement('tr');
+                tr.innerHTML = `
+                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">${row['Month']}</td>
+                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">${row['Year']}</td>
+                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">$${row['Principal Payment'].toFixed(2)}</td>
+                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">$${row['Interest Payment'].toFixed(2)}</td>
+                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">$${row['Principal Paid'].toFixed(2)}</td>
+                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">$${row['Interest Paid'].toFixed(2)}</td>
+                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">$${row['Loan Balance'].toFixed(2)}</td>
+                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">$${row['Total Amount Paid'].toFixed(2)}</td>
+                `;
+                amortizationTableBody.appendChild(tr);
+            });
+
+            // Update pagination controls
+            scheduleOffset = offset;
+            scheduleLength = data.schedule_length;
+            const lastRow = Math.min(offset + scheduleRows.length, scheduleLength);
+            schedulePageInfo.textContent = `Rows ${offset + 1}-${lastRow} of ${scheduleLength}`;
+            prevSchedulePageBtn.disabled = offset === 0;
+            nextSchedulePageBtn.disabled = lastRow >= scheduleLength;
+            return true;
+
+        } catch (error) {
+            console.error('Fetch error:', error);
+            showMessageBox(`An unexpected error occurred: ${error.message}`);
+            return false;
+        }
+    }
+
+    prevSchedulePageBtn.addEventListener('click', () => {
+        loadSchedulePage(Math.max(scheduleOffset - SCHEDULE_PAGE_SIZE, 0));
+    });
+
+    nextSchedulePageBtn.addEventListener('click', () => {
+        loadSchedulePage(scheduleOffset + SCHEDULE_PAGE_SIZE);
+    });
+
     // Handle form submission
     loanForm.addEventListener('submit', async (event) => {
         event.preventDefault(); // Prevent default form submission
@@ -149,49 +270,9 @@ document.addEventListener('DOMContentLoaded', () => {
             one_time_payments: oneTimePayments
         };
 
-        try {
-            const response = await fetch('/calculate', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify(payload)
-            });
-
-            if (!response.ok) {
-                const errorData = await response.json();
-                showMessageBox(`Error: ${errorData.detail || response.statusText}`);
-                return;
-            }
-
-            const data = await response.json();
-
-            // Display summary results
-            baseMonthlyPaymentSpan.textContent = `$${data.monthly_payment.toFixed(2)}`;
-            totalAmountPaidSpan.textContent = `$${data.total_amount_paid.toFixed(2)}`;
-            payoffDateSpan.textContent = data.payoff_date || 'N/A';
-
-            // Populate amortization table
-            data.amortization_schedule.forEach(row => {
-                const tr = document.createElement('tr');
-                tr.innerHTML = `
-                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">${row['Month']}</td>
-                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">${row['Year']}</td>
-                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">$${row['Principal Payment'].toFixed(2)}</td>
-                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">$${row['Interest Payment'].toFixed(2)}</td>
-                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">$${row['Principal Paid'].toFixed(2)}</td>
-                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">$${row['Interest Paid'].toFixed(2)}</td>
-                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">$${row['Loan Balance'].toFixed(2)}</td>
-                    <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">$${row['Total Amount Paid'].toFixed(2)}</td>
-                `;
-                amortizationTableBody.appendChild(tr);
-            });
-
+        currentPayload = payload;
+        if (await loadSchedulePage(0)) {
             resultsDiv.classList.remove('hidden'); // Show results section
-
-        } catch (error) {
-            console.error('Fetch error:', error);
-            showMessageBox(`An unexpected error occurred: ${error.message}`);
         }
     });
 });
@@ -0,0 +1,171 @@
+"""
+The NumPy engine and everything built on it (summarize, calculate_many, recalculate, project_portfolio)
+must agree with the month-by-month loop engine to the cent. Both engines treat a balance under half a cent as paid off.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import random
+
+import numpy as np
+import pytest
+
+from main import PORTFOLIO_COLUMNS, SCHEDULE_COLUMNS, Loan, first_changed_month, month_index
+
+CENT = 0.005
+
+LOAN = dict(price=400000, down_percentage=20, term=30, rate=6.5, start_month=3, start_year=2024)
+
+CASES = {
+    'base': {},
+    'zero_rate': dict(rate=0),
+    'zero_rate_with_extras': dict(rate=0, monthly_extra_payment=150, yearly_extra_payment=2000),
+    'short_term': dict(term=1),
+    'monthly_extra': dict(monthly_extra_payment=500),
+    'yearly_extra': dict(yearly_extra_payment=5000),
+    'one_time_payments': dict(one_time_payments=[
+        {'amount': 10000, 'month': 6, 'year': 2026}, {'amount': 2500.5, 'month': 1, 'year': 2030},
+    ]),
+    'early_payoff': dict(monthly_extra_payment=200, one_time_payments=[{'amount': 300000, 'month': 1, 'year': 2030}]),
+    'overpaid_final_month': dict(term=5, monthly_extra_payment=6000),
+    'negative_monthly_extra': dict(monthly_extra_payment=-100),
+    'negative_one_time_payment': dict(one_time_payments=[{'amount': -5000, 'month': 4, 'year': 2025}]),
+    'high_rate': dict(rate=60, term=40),
+    'zero_principal': dict(down_percentage=100),
+    'zero_term': dict(term=0),
+}
+
+
+def random_loans(count, seed=1):
+    rng = random.Random(seed)
+    loans = []
+    for _ in range(count):
+        start_year = rng.randint(2000, 2030)
+        loan = dict(
+            price=rng.choice([0, rng.uniform(1000, 2_000_000)]),
+            down_percentage=rng.choice([0, rng.uniform(0, 60)]),
+            term=rng.randint(0, 40),
+            rate=rng.choice([0, rng.uniform(0, 15)]),
+            start_month=rng.randint(1, 12),
+            start_year=start_year,
+            monthly_extra_payment=rng.choice([0, 0, rng.uniform(0, 2000), rng.uniform(-50, 0)]),
+            yearly_extra_payment=rng.choice([0, 0, rng.uniform(0, 20000)]),
+            one_time_payments=[
+                {'amount': rng.uniform(-1000, 100000), 'month': rng.randint(1, 12),
+                 'year': rng.randint(start_year, start_year + 30)}
+                for _ in range(rng.choice([0, 0, 1, 5]))
+            ],
+        )
+        loans.append(loan)
+    return loans
+
+
+def assert_same_result(result, expected):
+    assert result.monthly_payment == pytest.approx(expected.monthly_payment, abs=CENT)
+    assert result.total_amount_paid == pytest.approx(expected.total_amount_paid, abs=CENT)
+    assert (result.payoff_month, result.payoff_year) == (expected.payoff_month, expected.payoff_year)
+    schedule, expected_schedule = result.amortization_schedule, expected.amortization_schedule
+    assert len(schedule) == len(expected_schedule)
+    for name in SCHEDULE_COLUMNS:
+        np.testing.assert_allclose(schedule[name], expected_schedule[name], rtol=0, atol=CENT, err_msg=name)
+
+
+@pytest.mark.parametrize('case', CASES)
+def test_numpy_engine_matches_loop(case):
+    loan = dict(LOAN, **CASES[case])
+    assert_same_result(Loan().calculate(**loan, engine='numpy'), Loan().calculate(**loan, engine='loop'))
+
+
+def test_numpy_engine_matches_loop_on_random_loans():
+    for loan in random_loans(300):
+        assert_same_result(Loan().calculate(**loan, engine='numpy'), Loan().calculate(**loan, engine='loop'))
+
+
+def test_engines_agree_at_tiny_rates():
+    # (1 + r) ** n - 1 loses most of its digits at these rates; see _growth_less_one
+    rng = random.Random(4)
+    loans = [dict(price=500000, down_percentage=10, term=30, rate=1e-6, start_month=5, start_year=2020)]
+    loans += [dict(loan, rate=rng.uniform(1e-6, 3e-5)) for loan in random_loans(100, seed=4)]
+    for loan, batch_result in zip(loans, Loan.calculate_many(loans)):
+        expected = Loan().calculate(**loan, engine='loop')
+        assert_same_result(Loan().calculate(**loan, engine='numpy'), expected)
+        assert Loan().summarize(**loan).total_amount_paid == pytest.approx(expected.total_amount_paid, abs=CENT)
+        assert batch_result['total_amount_paid'] == pytest.approx(expected.total_amount_paid, abs=CENT)
+
+
+def test_residue_after_the_last_scheduled_payment_is_paid_off():
+    # The residue left here is about 2e-8; the loop used to charge a 361st full payment for it
+    loan = dict(price=904000, down_percentage=10, term=30, rate=5.645, start_month=1, start_year=2024)
+    for engine in ('numpy', 'loop'):
+        result = Loan().calculate(**loan, engine=engine)
+        assert len(result.amortization_schedule) == 361  # Start row and 360 payments
+        assert (result.payoff_month, result.payoff_year) == (1, 2054)
+        assert result.amortization_schedule['Loan Balance'][-1] == 0
+        assert result.total_amount_paid == pytest.approx(360 * result.monthly_payment, abs=CENT)
+    summary = Loan().summarize(**loan)
+    assert (summary.payoff_month, summary.payoff_year, summary.months_saved) == (1, 2054, 0)
+
+
+@pytest.mark.parametrize('case', CASES)
+def test_summarize_matches_loop(case):
+    loan = dict(LOAN, **CASES[case])
+    expected = Loan().calculate(**loan, engine='loop')
+    summary = Loan().summarize(**loan)
+    assert summary.total_amount_paid == pytest.approx(expected.total_amount_paid, abs=CENT)
+    assert summary.total_interest == pytest.approx(expected.amortization_schedule['Interest Paid'][-1], abs=CENT)
+    assert (summary.payoff_month, summary.payoff_year) == (expected.payoff_month, expected.payoff_year)
+
+
+def test_calculate_many_matches_loop():
+    loans = [dict(LOAN, **overrides) for overrides in CASES.values()] + random_loans(100, seed=2)
+    for loan, result in zip(loans, Loan.calculate_many(loans)):
+        expected = Loan().calculate(**loan, engine='loop')
+        assert result['total_amount_paid'] == pytest.approx(expected.total_amount_paid, abs=CENT)
+        assert (result['payoff_month'], result['payoff_year']) == (expected.payoff_month, expected.payoff_year)
+
+
+@pytest.mark.parametrize('group_by', [None, 'term', 'rate'])
+def test_project_portfolio_matches_merged_schedules(group_by):
+    loans = random_loans(200, seed=5)
+    expected = {}  # (group, month_index) -> summed principal, interest, payment, balance and active loans
+    for loan in loans:
+        schedule = Loan().calculate(**loan, engine='loop').amortization_schedule
+        group = {None: None, 'term': loan['term'], 'rate': round(np.floor(loan['rate'] / 0.5) * 0.5, 10)}[group_by]
+        payments = np.diff(schedule['Total Amount Paid'], prepend=0.0)
+        for row in range(len(schedule)):
+            key = (group, month_index(int(schedule['Year'][row]), int(schedule['Month'][row])))
+            expected[key] = expected.get(key, 0) + np.array([
+                schedule['Principal Payment'][row], schedule['Interest Payment'][row], payments[row],
+                schedule['Loan Balance'][row], 1,
+            ])
+
+    projected = {}
+    for group, columns in Loan.project_portfolio(loans, group_by=group_by).items():
+        for row in range(len(columns['Month'])):
+            key = (group, month_index(int(columns['Year'][row]), int(columns['Month'][row])))
+            projected[key] = np.array([columns[name][row] for name in PORTFOLIO_COLUMNS[2:]])
+    assert expected.keys() <= projected.keys()
+    for key, values in projected.items():
+        np.testing.assert_allclose(values, expected.get(key, np.zeros(5)), rtol=0, atol=CENT, err_msg=str(key))
+
+
+@pytest.mark.parametrize('engine', ['numpy', 'loop'])
+def test_recalculate_matches_calculate(engine):
+    previous = dict(LOAN, monthly_extra_payment=100)
+    previous_schedule = Loan().calculate(**previous).amortization_schedule
+    current = dict(previous, one_time_payments=[{'amount': 20000, 'month': 7, 'year': 2031}])
+    changed_month = first_changed_month(previous, current)
+    result = Loan().recalculate(previous_schedule, changed_month, **current, engine=engine)
+    assert_same_result(result, Loan().calculate(**current, engine='loop'))
+
+
+@pytest.mark.parametrize('overrides', [dict(start_month=13), dict(start_month=0), dict(start_year=0), dict(term=-1)])
+def test_invalid_terms_are_rejected(overrides):
+    loan = dict(LOAN, **overrides)
+    for engine in ('numpy', 'loop'):
+        with pytest.raises(ValueError):
+            Loan().calculate(**loan, engine=engine)
+    with pytest.raises(ValueError):
+        Loan().summarize(**loan)
+    with pytest.raises(ValueError):
+        Loan.calculate_many([loan])
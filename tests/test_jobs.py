@@ -0,0 +1,169 @@
+"""
+Job stores and JobQueue: the queue bound, cancellation, result expiry, lease takeover and, with SQLite,
+sharing one store between queues. Store tests run against both MemoryJobStore and SQLiteJobStore.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from jobs import CANCELLED, FAILED, QUEUED, RUNNING, SUCCEEDED, Job, JobQueue, MemoryJobStore, QueueFull, SQLiteJobStore
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryJobStore()
+    return SQLiteJobStore(str(tmp_path / 'jobs.db'))
+
+
+def add_job(store, job_id, created_at=0.0, params=None):
+    job = Job(job_id, 'echo', params or {}, created_at=created_at)
+    assert store.add(job, max_queued=100)
+    return job
+
+
+async def wait_for_status(queue, job_id, statuses, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = await queue.get(job_id, with_result=True)
+        if job is not None and job.status in statuses:
+            return job
+        assert time.monotonic() < deadline, f"job {job_id} is still {job and job.status}"
+        await asyncio.sleep(0.01)
+
+
+def test_full_queue_raises_queue_full(store):
+    async def scenario():
+        queue = JobQueue({'echo': dict}, store=store, workers=0, max_queued=2)
+        await queue.start()
+        try:
+            await queue.submit('echo', {})
+            await queue.submit('echo', {})
+            with pytest.raises(QueueFull):
+                await queue.submit('echo', {})
+            assert (queue.submitted, queue.rejected) == (2, 1)
+            assert (await queue.stats())['queued'] == 2
+        finally:
+            await queue.stop()
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_running_job_drops_its_result(store):
+    add_job(store, 'a')
+    assert store.claim_next('owner', now=1.0).id == 'a'
+    job, cancelled = store.cancel('a', now=2.0)
+    assert cancelled and job.status == CANCELLED
+    assert not store.finish('a', 'owner', SUCCEEDED, now=3.0, result={'answer': 42})
+    job = store.get('a')
+    assert (job.status, job.result, job.finished_at) == (CANCELLED, None, 2.0)
+    assert store.cancel('a', now=4.0)[1] is False  # Already finished
+
+
+def test_queue_discards_result_of_job_cancelled_while_running(store):
+    started, release = threading.Event(), threading.Event()
+
+    def handler(params):
+        started.set()
+        release.wait(10)
+        return {'answer': 42}
+
+    async def scenario():
+        queue = JobQueue({'slow': handler}, store=store)
+        await queue.start()
+        try:
+            job = await queue.submit('slow', {})
+            await asyncio.to_thread(started.wait, 10)
+            assert (await queue.cancel(job.id)).status == CANCELLED
+            release.set()
+            while (await queue.stats())['running']:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)  # Let the worker try to record the result
+            job = await queue.get(job.id, with_result=True)
+            assert (job.status, job.result) == (CANCELLED, None)
+            assert queue.finished == {SUCCEEDED: 0, FAILED: 0, CANCELLED: 1}
+        finally:
+            release.set()
+            await queue.stop()
+
+    asyncio.run(scenario())
+
+
+def test_finished_jobs_expire_and_are_purged(store):
+    now = [100.0]
+    queue = JobQueue({'echo': dict}, store=store, result_ttl=60.0, clock=lambda: now[0])
+    add_job(store, 'old', created_at=0.0)
+    add_job(store, 'new', created_at=1.0)
+    store.claim_next('owner', now=10.0)
+    store.claim_next('owner', now=10.0)
+    assert store.finish('old', 'owner', SUCCEEDED, now=20.0, result={})
+    assert store.finish('new', 'owner', SUCCEEDED, now=90.0, result={})
+
+    assert asyncio.run(queue.get('old')) is None  # Expired at 80
+    assert asyncio.run(queue.get('new')).status == SUCCEEDED
+    assert store.purge(finished_before=now[0] - 60.0) == 1
+    assert store.get('old') is None
+    assert store.get('new').status == SUCCEEDED
+
+    now[0] = 200.0
+    assert asyncio.run(queue.get('new')) is None
+    assert store.purge(finished_before=now[0] - 60.0) == 1
+    assert store.get('new') is None
+
+
+def test_stale_lease_is_requeued_and_live_owner_kept(store):
+    add_job(store, 'crashed', created_at=0.0)
+    add_job(store, 'alive', created_at=1.0)
+    assert store.claim_next('crashed-owner', now=10.0).id == 'crashed'
+    assert store.claim_next('live-owner', now=10.0).id == 'alive'
+    store.heartbeat('live-owner', now=50.0)
+
+    assert store.requeue_stale(heartbeat_before=40.0) == 1
+    crashed, alive = store.get('crashed'), store.get('alive')
+    assert (crashed.status, crashed.owner) == (QUEUED, None)
+    assert (alive.status, alive.owner) == (RUNNING, 'live-owner')
+    assert store.count_queued() == 1
+
+    # The job now belongs to whoever claims it next; its old owner can no longer finish it
+    assert store.claim_next('new-owner', now=60.0).id == 'crashed'
+    assert not store.finish('crashed', 'crashed-owner', SUCCEEDED, now=70.0, result={})
+    assert store.finish('crashed', 'new-owner', SUCCEEDED, now=70.0, result={'ok': True})
+    assert store.get('crashed').result == {'ok': True}
+
+
+def test_queues_sharing_a_sqlite_file_never_claim_the_same_job(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    runs = []
+    lock = threading.Lock()
+
+    def handler(params):
+        with lock:
+            runs.append(params['n'])
+        time.sleep(0.002)
+        return params
+
+    async def scenario():
+        # Each queue has its own store and connection, as separate server processes would
+        queues = [
+            JobQueue({'echo': handler}, store=SQLiteJobStore(path), workers=3, max_queued=1000, poll_interval=0.01)
+            for _ in range(2)
+        ]
+        for n in range(60):  # Queued before either queue starts, so all six workers race for them
+            add_job(queues[n % 2].store, f'job-{n}', created_at=n, params={'n': n})
+        for queue in queues:
+            await queue.start()
+        try:
+            for n in range(60):
+                await wait_for_status(queues[0], f'job-{n}', (SUCCEEDED,))
+        finally:
+            for queue in queues:
+                await queue.stop()
+        assert sum(queue.finished[SUCCEEDED] for queue in queues) == 60
+
+    asyncio.run(scenario())
+    assert sorted(runs) == list(range(60))  # Each job ran exactly once
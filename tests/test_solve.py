@@ -0,0 +1,56 @@
+"""
+Loan.solve_extra_payment must return the smallest extra payment, in whole cents, that reaches its target.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import random
+
+import pytest
+
+from main import Loan, month_index
+
+
+def pays_off_by(loan, target_month, target_year, **extras):
+    summary = Loan().summarize(**loan, **extras)
+    return summary.payoff_year is not None and (
+        month_index(summary.payoff_year, summary.payoff_month) <= month_index(target_year, target_month)
+    )
+
+
+def test_closed_form_answer_is_minimal_when_rounding_overshoots():
+    loan = dict(price=300000, down_percentage=20, term=5, rate=3, start_month=12, start_year=2020)
+    solution = Loan().solve_extra_payment(**loan, target_month=1, target_year=2021)
+    assert solution.extra_payment == 236287.51
+    assert pays_off_by(loan, 1, 2021, monthly_extra_payment=236287.51)
+    assert not pays_off_by(loan, 1, 2021, monthly_extra_payment=236287.50)
+
+
+@pytest.mark.parametrize('frequency', ['monthly', 'yearly'])
+def test_payoff_date_answers_are_minimal(frequency):
+    rng = random.Random(3)
+    key = f'{frequency}_extra_payment'
+    for _ in range(150):
+        loan = dict(
+            price=rng.uniform(1e4, 1e6), down_percentage=rng.uniform(0, 50), term=rng.choice([1, 5, 15, 30]),
+            rate=rng.choice([0, 1.5, 3, 7, 12]), start_month=rng.randint(1, 12), start_year=2020,
+        )
+        target_month, target_year = rng.randint(1, 12), 2020 + rng.randint(0, loan['term'])
+        try:
+            solution = Loan().solve_extra_payment(
+                **loan, target_month=target_month, target_year=target_year, frequency=frequency
+            )
+        except ValueError:
+            continue  # Unreachable target
+        assert pays_off_by(loan, target_month, target_year, **{key: solution.extra_payment})
+        if solution.extra_payment > 0:
+            less = round(solution.extra_payment - 0.01, 2)
+            assert not pays_off_by(loan, target_month, target_year, **{key: less})
+
+
+def test_total_interest_answer_is_minimal():
+    loan = dict(price=300000, down_percentage=20, term=30, rate=5.0, start_month=1, start_year=2024)
+    solution = Loan().solve_extra_payment(**loan, target_total_interest=100000)
+    assert Loan().summarize(**loan, monthly_extra_payment=solution.extra_payment).total_interest <= 100000
+    less = round(solution.extra_payment - 0.01, 2)
+    assert Loan().summarize(**loan, monthly_extra_payment=less).total_interest > 100000